@@ -0,0 +1,315 @@
+"""Concurrent-session load test against a locally started dashboard.
+
+Starts ``streamlit run main.py`` on a free local port and drives it with
+simulated browser sessions over Streamlit's own WebSocket protocol (the
+``BackMsg`` / ``ForwardMsg`` protobufs; no browser and no external services).
+Each session replays a widget interaction script, one full rerun per step,
+in a loop:
+
+* ``slider_drag``  – the year range slider dragged in steps from both ends
+* ``state_picks``  – states added to / removed from the State/UT multiselect
+* ``select_all``   – "Select All" removed and re-added, for states and categories
+* ``mixed``        – a random walk over all of the above
+
+Sessions are added in levels (``--sessions 1 5 10 20``); earlier sessions
+stay connected and keep replaying. For every level it reports rerun latency
+percentiles (send to ``script_finished``), throughput and the server's RSS,
+plus the RSS growth per added session (least-squares slope over the levels)::
+
+    python benchmarks/bench_load.py
+    python benchmarks/bench_load.py --sessions 1 10 25 50 --duration 30 --think 0.5
+    python benchmarks/bench_load.py --scale 100 --json          # synthetic 100x data
+
+Linux only (reads ``/proc/<pid>/status``). Environment variables such as
+``DASHBOARD_SHARED_DIR`` or ``DASHBOARD_MAP_MODE`` are passed on to the server.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+SCRIPTS = ("slider_drag", "state_picks", "select_all", "mixed")
+
+YEARS_LABEL = "Select Year Range"
+STATES_LABEL = "Select States/UT"
+CATEGORIES_LABEL = "Select Offender Categories"
+SELECT_ALL = "Select All"
+
+RERUN_TIMEOUT = 300
+
+
+# -------------------------
+# Interaction scripts
+# -------------------------
+def _script_steps(name, rng, years, states, categories):
+    """One pass of script ``name``: a list of ``{widget label: value}`` changes, one rerun each."""
+    first, last = years
+    if name == "slider_drag":
+        steps = [{YEARS_LABEL: [first, end]} for end in range(last - 1, first + (last - first) // 2, -1)]
+        steps += [{YEARS_LABEL: [start, last]} for start in range(first + 1, first + (last - first) // 2)]
+        return steps + [{YEARS_LABEL: [first, last]}]
+    if name == "state_picks":
+        picked = rng.sample(states, 4)
+        steps = [{STATES_LABEL: picked[:n]} for n in range(1, len(picked) + 1)]
+        steps += [{STATES_LABEL: picked[:n]} for n in range(len(picked) - 1, 0, -1)]
+        return steps + [{STATES_LABEL: [SELECT_ALL]}]
+    if name == "select_all":
+        return [
+            {STATES_LABEL: []}, {STATES_LABEL: [SELECT_ALL]},
+            {CATEGORIES_LABEL: rng.sample(categories, 2)}, {CATEGORIES_LABEL: [SELECT_ALL]},
+        ]
+    # mixed: a random walk over the other scripts' steps
+    pool = [step for other in SCRIPTS[:-1] for step in _script_steps(other, rng, years, states, categories)]
+    return rng.sample(pool, min(len(pool), 12)) + [{STATES_LABEL: [SELECT_ALL], YEARS_LABEL: [first, last], CATEGORIES_LABEL: [SELECT_ALL]}]
+
+
+# -------------------------
+# Simulated browser session
+# -------------------------
+class Session:
+    """One WebSocket session that reruns the script with changed widget values."""
+
+    def __init__(self, url):
+        self.url = url
+        self.widgets = {}       # label -> (widget id, proto field)
+        self.options = {}       # label -> the widget's options ((min, max) for sliders)
+        self.values = {}        # widget id -> (field, value): what the "browser" currently shows
+        self.page_script_hash = ""
+        self.exceptions = 0
+
+    async def connect(self):
+        import websockets
+
+        self.ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None, open_timeout=60)
+        result = await self.rerun({})
+        if YEARS_LABEL not in self.widgets:
+            raise RuntimeError("sidebar filters not found; the load test drives them, so run the server without DASHBOARD_FILTER_MODE=client")
+        return result
+
+    async def rerun(self, changes):
+        """Apply ``changes`` and wait for the rerun to finish; returns ``(seconds, ok)``."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.page_script_hash = self.page_script_hash
+        for label, value in changes.items():
+            widget_id, field = self.widgets[label]
+            self.values[widget_id] = (field, value)
+        for widget_id, (field, value) in self.values.items():
+            widget = state.widget_states.widgets.add()
+            widget.id = widget_id
+            getattr(widget, field).data.extend(value)
+
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        status = await asyncio.wait_for(self._until_finished(), RERUN_TIMEOUT)
+        return time.perf_counter() - start, status == 0
+
+    async def _until_finished(self):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await self.ws.recv())
+            kind = msg.WhichOneof("type")
+            if kind == "new_session":
+                self.page_script_hash = msg.new_session.page_script_hash
+            elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                self._record(msg.delta.new_element)
+            elif kind == "script_finished":
+                return msg.script_finished
+
+    def _record(self, element):
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            self.exceptions += 1
+        elif kind == "slider":
+            self.widgets[element.slider.label] = (element.slider.id, "double_array_value")
+            self.options[element.slider.label] = (int(element.slider.min), int(element.slider.max))
+        elif kind == "multiselect":
+            self.widgets[element.multiselect.label] = (element.multiselect.id, "string_array_value")
+            self.options[element.multiselect.label] = [o for o in element.multiselect.options if o != SELECT_ALL]
+
+    async def close(self):
+        await self.ws.close()
+
+
+async def _replay(session, name, seed, think, stop, latencies, errors):
+    rng = random.Random(seed)
+    options = [session.options[label] for label in (YEARS_LABEL, STATES_LABEL, CATEGORIES_LABEL)]
+    while not stop.is_set():
+        for step in _script_steps(name, rng, *options):
+            if stop.is_set():
+                return
+            try:
+                seconds, ok = await session.rerun(step)
+            except Exception:
+                errors.append(1)
+                return
+            latencies.append(seconds)
+            if not ok:
+                errors.append(1)
+            if think:
+                await asyncio.sleep(rng.uniform(0, think))
+
+
+# -------------------------
+# Server
+# -------------------------
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, env, log):
+    """Start the app; its output goes to the file ``log`` (a pipe nobody reads would block it)."""
+    cmd = [sys.executable, "-m", "streamlit", "run", str(ROOT / "main.py"), "--server.headless", "true",
+           "--server.port", str(port), "--server.address", "127.0.0.1", "--browser.gatherUsageStats", "false"]
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            log.seek(0)
+            raise RuntimeError(f"streamlit exited:\n{log.read().decode()[-2000:]}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=2) as resp:
+                if resp.status == 200:
+                    return proc
+        except OSError:
+            time.sleep(0.25)
+    proc.kill()
+    raise RuntimeError("streamlit did not become healthy within 120s")
+
+
+def rss_mb(pid):
+    with open(f"/proc/{pid}/status") as fh:
+        for line in fh:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def _percentiles(latencies):
+    import numpy as np
+
+    if not latencies:
+        return {"p50": None, "p95": None, "p99": None}
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {"p50": p50, "p95": p95, "p99": p99}
+
+
+# -------------------------
+# Driver
+# -------------------------
+async def run_levels(url, pid, levels, duration, think, scripts, seed):
+    report = {"baseline_rss_mb": rss_mb(pid), "levels": []}
+    sessions, tasks = [], []
+    for count in levels:
+        connect_start = time.perf_counter()
+        while len(sessions) < count:
+            session = Session(url)
+            await session.connect()
+            sessions.append(session)
+        connect_seconds = time.perf_counter() - connect_start
+
+        stop, latencies, errors = asyncio.Event(), [], []
+        tasks = [
+            asyncio.create_task(_replay(s, scripts[i % len(scripts)], seed + i, think, stop, latencies, errors))
+            for i, s in enumerate(sessions)
+        ]
+        start = time.perf_counter()
+        await asyncio.sleep(duration)
+        stop.set()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+        report["levels"].append({
+            "sessions": count,
+            "reruns": len(latencies),
+            "throughput": len(latencies) / elapsed,
+            "errors": len(errors) + sum(s.exceptions for s in sessions),
+            "connect_seconds": connect_seconds,
+            "rss_mb": rss_mb(pid),
+            **_percentiles(latencies),
+        })
+
+    for session in sessions:
+        await session.close()
+    report["rss_mb_per_session"] = _rss_slope(report["levels"])
+    return report
+
+
+def _rss_slope(levels):
+    import numpy as np
+
+    if len(levels) < 2:
+        return None
+    sessions = [level["sessions"] for level in levels]
+    rss = [level["rss_mb"] for level in levels]
+    return float(np.polyfit(sessions, rss, 1)[0])
+
+
+def print_report(report):
+    print(f"server RSS before any session: {report['baseline_rss_mb']:.0f} MB")
+    print(f"{'sessions':>8} {'reruns':>7} {'rerun/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6} {'RSS MB':>7}")
+    for level in report["levels"]:
+        ms = [f"{level[p] * 1000:8.0f}" if level[p] is not None else f"{'-':>8}" for p in ("p50", "p95", "p99")]
+        print(f"{level['sessions']:>8} {level['reruns']:>7} {level['throughput']:>8.2f} {' '.join(ms)} {level['errors']:>6} {level['rss_mb']:>7.0f}")
+    if report["rss_mb_per_session"] is not None:
+        print(f"RSS growth per added session: {report['rss_mb_per_session']:.2f} MB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the dashboard with concurrent simulated sessions.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10, 20], help="session counts, in increasing order (default: 1 5 10 20)")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of replay per level (default: 20)")
+    parser.add_argument("--think", type=float, default=1.0, help="max random pause between a session's reruns, seconds (default: 1)")
+    parser.add_argument("--scripts", nargs="+", choices=SCRIPTS, default=list(SCRIPTS), help="interaction scripts, assigned round-robin")
+    parser.add_argument("--scale", type=int, default=None, help="serve a synthetic copy at this scale (see synthetic.py)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    if sorted(args.sessions) != args.sessions:
+        parser.error("--sessions must be increasing")
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        env = dict(os.environ)
+        if args.scale:
+            from synthetic import generate
+
+            generate(data_dir, args.scale)
+            env.update(DASHBOARD_DATA_DIR=data_dir, DASHBOARD_REPEATED_KEYS="1")
+        port = _free_port()
+        with tempfile.TemporaryFile() as log:
+            server = start_server(port, env, log)
+            try:
+                report = asyncio.run(run_levels(f"ws://127.0.0.1:{port}/_stcore/stream", server.pid, args.sessions,
+                                                args.duration, args.think, args.scripts, args.seed))
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""Headless rerun benchmark across filter scenarios and data scales.
+
+For every dataset (the shipped CSVs, then synthetic copies at each ``--scales``
+factor, see ``synthetic.py``) a fresh interpreter is started with
+``DASHBOARD_DATA_DIR`` pointed at it and measures:
+
+* ``cold_load``  – first ``load_cube()``: CSV parse + cube build
+* ``sections``   – per-section wall time, Python peak memory (tracemalloc, in a
+  separate untimed pass) and payload bytes, calling each section's builder
+  directly for every scenario
+* ``rerun``      – whole-script rerun time through Streamlit's AppTest after
+  switching the sidebar to the scenario, with the session's section results
+  dropped; ``cold`` also clears the shared result cache, ``warm`` is served
+  from it
+* ``max_rss_mb`` – peak resident set size of the worker
+
+::
+
+    python benchmarks/bench_rerun.py                       # shipped, 10x, 100x, 1000x
+    python benchmarks/bench_rerun.py --scales 10 --json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# name -> (selected states, year range); None keeps the widget's default
+SCENARIOS = {
+    "all_states": (None, None),
+    "single_state": (["Madhya Pradesh"], None),
+    "narrow_years": (None, (2010, 2012)),
+    "empty_selection": ([], None),
+}
+
+
+# -------------------------
+# Worker (runs inside the fresh interpreter)
+# -------------------------
+def _section_builders():
+    from dashboard import figures
+    from dashboard.kpis import compute_kpis
+
+    return {
+        "kpis": compute_kpis,
+        "yearly_trend": figures.yearly_trend_figure,
+        "category_trend": figures.category_trend_figure,
+        "state_bars": figures.state_bars_figure,
+        "category_pie": figures.category_pie_figure,
+        "correlation": figures.correlation_figure,
+        "choropleth": figures.choropleth_figure,
+        "choropleth_values": figures.choropleth_values,
+    }
+
+
+def _payload_bytes(result):
+    if result is None:
+        return 0
+    if hasattr(result, "to_json"):
+        return len(result.to_json())
+    return len(json.dumps(result))
+
+
+def _time_sections(cube, filters, geo):
+    import time
+    import tracemalloc
+
+    from dashboard.sections import section_key
+
+    timings = {}
+    for name, build in _section_builders().items():
+        args = (cube, geo) if name.startswith("choropleth") else (cube,)
+        if name.startswith("choropleth") and geo is None:
+            timings[name] = {"skipped": "boundaries unavailable"}
+            continue
+        inputs = section_key(name, filters)
+
+        start = time.perf_counter()
+        nbytes = _payload_bytes(build(*args, *inputs))
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        _payload_bytes(build(*args, *inputs))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        timings[name] = {"seconds": elapsed, "peak_mb": peak / 2**20, "payload_bytes": nbytes}
+    return timings
+
+
+def _apply_scenario(at, states, year_range):
+    if states is not None:
+        next(w for w in at.sidebar.multiselect if w.label == "Select States/UT").set_value(states)
+    if year_range is not None:
+        next(w for w in at.sidebar.slider if w.label == "Select Year Range").set_value(year_range)
+
+
+def _time_rerun(states, year_range, clear_shared):
+    import time
+
+    from streamlit.testing.v1 import AppTest
+
+    from dashboard.cache import result_cache
+
+    at = AppTest.from_file(str(ROOT / "main.py"), default_timeout=600)
+    at.run()
+    _apply_scenario(at, states, year_range)
+    at.session_state["_section_results"] = {}
+    if clear_shared:
+        result_cache.clear()
+    start = time.perf_counter()
+    at.run()
+    return time.perf_counter() - start, [e.message for e in at.exception]
+
+
+def worker():
+    import resource
+    import time
+
+    from dashboard.cube import load_cube
+    from dashboard.data import OFFENDER_CATEGORIES
+    from dashboard.geo import load_boundaries
+    from dashboard.sections import make_filters
+
+    start = time.perf_counter()
+    cube = load_cube()
+    report = {"cold_load": time.perf_counter() - start, "scenarios": {}}
+
+    try:
+        geo = load_boundaries()
+    except Exception as exc:  # no assets and no network: time everything else
+        geo, report["geo_error"] = None, str(exc)
+
+    for name, (states, year_range) in SCENARIOS.items():
+        filters = make_filters(
+            list(cube.states) if states is None else states,
+            year_range or (cube.min_year, cube.max_year),
+            OFFENDER_CATEGORIES,
+        )
+        cold, errors = _time_rerun(states, year_range, clear_shared=True)
+        warm, _ = _time_rerun(states, year_range, clear_shared=False)
+        report["scenarios"][name] = {
+            "sections": _time_sections(cube, filters, geo),
+            "rerun": {"cold": cold, "warm": warm},
+            "errors": errors,
+        }
+
+    report["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps(report))
+
+
+# -------------------------
+# Driver
+# -------------------------
+def run_dataset(data_dir):
+    # The synthetic rows are district-level: several per (state/UT, year)
+    env = dict(os.environ, DASHBOARD_DATA_DIR=str(data_dir), DASHBOARD_REPEATED_KEYS="1")
+    with tempfile.TemporaryDirectory() as snapshots:
+        env["DASHBOARD_SNAPSHOT_DIR"] = snapshots  # always measure a real CSV parse
+        proc = subprocess.run([sys.executable, __file__, "--worker"], env=env, cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(f"benchmark worker failed for {data_dir}:\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def print_report(label, report):
+    print(f"\n== {label}: cold load {report['cold_load']:.3f}s, max RSS {report['max_rss_mb']:.0f} MB")
+    for scenario, result in report["scenarios"].items():
+        rerun = result["rerun"]
+        print(f"  {scenario:<16} rerun cold {rerun['cold']:.3f}s  warm {rerun['warm']:.3f}s")
+        for section, timing in result["sections"].items():
+            if "skipped" in timing:
+                print(f"    {section:<15} skipped ({timing['skipped']})")
+            else:
+                print(f"    {section:<15} {timing['seconds'] * 1000:8.1f} ms  {timing['peak_mb']:7.2f} MB peak  {timing['payload_bytes'] / 1024:8.1f} KiB")
+        for error in result["errors"]:
+            print(f"    ERROR {error}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dashboard reruns on the shipped and synthetic datasets.")
+    parser.add_argument("--scales", type=int, nargs="*", default=[10, 100, 1000], help="synthetic scale factors (default: 10 100 1000)")
+    parser.add_argument("--no-shipped", action="store_true", help="skip the shipped CSVs")
+    parser.add_argument("--json", action="store_true", help="print all results as one JSON document")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        worker()
+        return 0
+
+    from synthetic import generate
+
+    results = {}
+    if not args.no_shipped:
+        results["shipped"] = run_dataset(ROOT)
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as data_dir:
+            generate(data_dir, scale)
+            results[f"{scale}x"] = run_dataset(data_dir)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for label, report in results.items():
+            print_report(label, report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Cold-start budget for the dashboard.
+
+Runs each measurement in a fresh interpreter (so nothing is already imported or
+cached) and fails when a phase goes over its budget or when the optional
+geospatial stack gets imported while serving the app::
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --import-budget 2.5 --render-budget 5 --json
+
+Phases:
+
+* ``import``       – importing everything ``main.py`` imports
+* ``data``         – first ``load_cube()`` (CSV/snapshot parse + cube build)
+* ``first_render`` – one full headless run of ``main.py`` via Streamlit's AppTest
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that must stay out of the serving path
+GEOSPATIAL_MODULES = ("geopandas", "shapely", "pyproj", "fiona", "pyogrio")
+
+PROBE = r"""
+import json, sys, time
+sys.path.insert(0, {root!r})
+result = {{}}
+
+t = time.perf_counter()
+import streamlit
+from dashboard import figures, sections, kpis, cube, data, geo
+result["import"] = time.perf_counter() - t
+
+t = time.perf_counter()
+cube.load_cube()
+result["data"] = time.perf_counter() - t
+
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({main!r}, default_timeout=120)
+t = time.perf_counter()
+at.run()
+result["first_render"] = time.perf_counter() - t
+result["exceptions"] = [e.message for e in at.exception]
+result["geospatial_imported"] = sorted(m for m in {geo_modules!r} if m in sys.modules)
+print(json.dumps(result))
+"""
+
+
+def measure():
+    code = PROBE.format(root=str(ROOT), main=str(ROOT / "main.py"), geo_modules=GEOSPATIAL_MODULES)
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the dashboard's cold-start time against a budget.")
+    parser.add_argument("--import-budget", type=float, default=1.5, help="seconds allowed for imports (default: 1.5)")
+    parser.add_argument("--data-budget", type=float, default=0.5, help="seconds allowed for the first data load (default: 0.5)")
+    parser.add_argument("--render-budget", type=float, default=2.0, help="seconds allowed for the first full render (default: 2.0)")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters to run; the best time counts (default: 3)")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args(argv)
+
+    runs = [measure() for _ in range(args.repeat)]
+    budgets = {"import": args.import_budget, "data": args.data_budget, "first_render": args.render_budget}
+    best = {phase: min(run[phase] for run in runs) for phase in budgets}
+
+    failures = [f"{phase}: {best[phase]:.3f}s > budget {budget:.3f}s" for phase, budget in budgets.items() if best[phase] > budget]
+    failures += [f"app raised: {msg}" for msg in runs[-1]["exceptions"]]
+    if runs[-1]["geospatial_imported"]:
+        failures.append(f"geospatial stack imported while serving: {', '.join(runs[-1]['geospatial_imported'])}")
+
+    if args.json:
+        print(json.dumps({"best": best, "budgets": budgets, "failures": failures}, indent=2))
+    else:
+        for phase, budget in budgets.items():
+            print(f"{phase:<13} {best[phase]:7.3f}s  (budget {budget:.3f}s)")
+        for failure in failures:
+            print(f"FAIL {failure}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""Synthetic, scaled copies of the two shipped CSVs.
+
+District-level data means many rows per (state, year), not more states, so each
+row of the shipped files is split into ``scale`` rows that add up to the
+original counts. The schemas and file names are unchanged::
+
+    STATE/UT,YEAR,<5 offender columns>      (1999-2013)
+    State/UT,Year,Cases_Reported            (2015-2020)
+
+Point ``DASHBOARD_DATA_DIR`` at the output directory, and declare the repeated
+keys with ``DASHBOARD_REPEATED_KEYS=1``, to run the app on it::
+
+    python benchmarks/synthetic.py --scale 100 --out /tmp/ncrb-100x
+    DASHBOARD_DATA_DIR=/tmp/ncrb-100x DASHBOARD_REPEATED_KEYS=1 streamlit run main.py
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from dashboard.data import ASSAULT, SUMMARY  # noqa: E402
+
+
+def _split_counts(counts, scale, rng):
+    """Split each count into ``scale`` non-negative parts with the same sum (multinomial)."""
+    if scale == 1:
+        return counts[:, None]
+    return rng.multinomial(counts, np.full(scale, 1.0 / scale))
+
+
+def scale_frame(frame, source, scale, rng):
+    keys = frame[[source.state_col, source.year_col]].loc[frame.index.repeat(scale)].reset_index(drop=True)
+    parts = {col: _split_counts(frame[col].to_numpy(), scale, rng).ravel() for col in source.count_cols}
+    return pd.concat([keys, pd.DataFrame(parts)], axis=1)
+
+
+def generate(out_dir, scale, seed=0):
+    """Write both sources at ``scale`` × the shipped row count into ``out_dir``; returns their paths."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+
+    written = []
+    for source in (ASSAULT, SUMMARY):
+        frame = pd.read_csv(ROOT / source.file_name)
+        path = out_dir / source.file_name
+        scale_frame(frame, source, scale, rng).to_csv(path, index=False)
+        written.append(path)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write scaled synthetic copies of the dashboard's CSV sources.")
+    parser.add_argument("--scale", type=int, default=10, help="rows per shipped row (default: 10)")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    for path in generate(args.out, args.scale, args.seed):
+        print(f"wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Data and aggregation helpers behind the Sexual Assault Cases Dashboard (``main.py``)."""
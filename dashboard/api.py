@@ -0,0 +1,309 @@
+"""JSON/HTTP API for the KPIs and the yearly / per-state series.
+
+A small asyncio HTTP/1.1 server (standard library only) answering ``GET``
+requests with JSON::
+
+    python -m dashboard.api --port 8502
+
+    GET /kpis?state=Bihar&state=Kerala&start=2005&end=2013
+    GET /series/yearly?start=2015&end=2020
+    GET /series/states
+    GET /series/trends?state=Kerala
+    GET /export/assault?format=parquet&start=2005&end=2010&column=STATE/UT&column=YEAR
+    GET /health
+
+Filters mirror the sidebar: repeat ``state`` for each State/UT (canonical
+names or any spelling known to :mod:`dashboard.states`; none means all) and
+give an inclusive ``start``/``end`` year range (default: every loaded year).
+``/series/trends`` lists, per state/UT and category, the linear and
+log-linear slope, growth per year and forecast (see :mod:`dashboard.trends`).
+``undivided=1`` answers from ``cube.undivided_cube``: Telangana and Ladakh are
+counted in the state they were split from in every year, so per-state series
+cover the same area across the 2014/2019 splits.
+
+``/export/<dataset>`` streams a download of :mod:`dashboard.export` (``format``
+csv/parquet/arrow, ``column`` repeated to project) with chunked transfer
+encoding: each chunk is encoded on the thread pool and written before the
+next is built, so no export is ever held whole in memory.
+
+Results come from the same machinery as the dashboard: the typed frames and
+the aggregate cube are loaded once per process (from the Parquet snapshots
+when present) and each result goes through ``sections.shared_result``, i.e.
+the process-wide LRU in :mod:`dashboard.cache`. Identical queries arriving
+while one is being computed wait for that computation instead of starting
+their own; the work itself runs on a thread pool so the event loop keeps
+accepting clients.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+from http import HTTPStatus
+from typing import Iterator, NamedTuple
+from urllib.parse import parse_qs, urlsplit
+
+from dashboard import export
+from dashboard import states as state_table
+from dashboard.cube import load_cube, undivided_cube
+from dashboard.kpis import compute_kpis, state_series, yearly_series
+from dashboard.sections import make_filters, shared_result
+from dashboard.trends import trend_table
+
+logger = logging.getLogger(__name__)
+
+# path -> (result name, builder)
+ENDPOINTS = {
+    "/kpis": ("kpis", compute_kpis),
+    "/series/yearly": ("yearly_series", yearly_series),
+    "/series/states": ("state_series", state_series),
+    "/series/trends": ("trend_table", trend_table),
+}
+
+EXPORT_PREFIX = "/export/"
+
+MAX_HEADER_BYTES = 16 * 1024
+
+
+class BadRequest(ValueError):
+    pass
+
+
+class Stream(NamedTuple):
+    """A response body sent chunk by chunk."""
+    chunks: Iterator[bytes]
+    content_type: str
+    file_name: str
+
+
+# -------------------------
+# Query handling
+# -------------------------
+def parse_filters(cube, query):
+    """Sidebar-equivalent ``Filters`` from the query string."""
+    names = []
+    for name in query.get("state", []):
+        try:
+            code = state_table.state_code(name)
+        except state_table.UnknownStateError:
+            code = None
+        if code is None:
+            raise BadRequest(f"Unknown state/UT {name!r}")
+        if cube.undivided:
+            code = state_table.undivided_code(code)
+        names.append(state_table.STATES[code])
+
+    try:
+        start = int(query.get("start", [cube.min_year])[-1])
+        end = int(query.get("end", [cube.max_year])[-1])
+    except ValueError:
+        raise BadRequest("start and end must be years")
+    if start > end:
+        raise BadRequest("start must not be after end")
+    if end < cube.min_year or start > cube.max_year:
+        raise BadRequest(f"{start}-{end} is outside the loaded years {cube.min_year}-{cube.max_year}")
+
+    return make_filters(names or list(cube.states), (start, end), ())
+
+
+class Coalescer:
+    """Runs one computation per distinct key at a time; concurrent callers share its result."""
+
+    def __init__(self):
+        self._inflight = {}
+        self.coalesced = 0
+
+    async def run(self, key, func, *args):
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await asyncio.to_thread(func, *args)
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # mark as retrieved; waiters still get it
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+            if not future.done():  # cancelled while computing
+                future.cancel()
+
+
+_coalescer = Coalescer()
+
+
+def export_stream(cube, name, query):
+    """:class:`Stream` of ``GET /export/<name>``; raises :class:`BadRequest`."""
+    if name not in export.DATASETS:
+        raise BadRequest(f"Unknown dataset {name!r}; expected one of {export.DATASETS}")
+    fmt = query.get("format", ["csv"])[-1]
+    if fmt not in export.FORMATS:
+        raise BadRequest(f"Unknown format {fmt!r}; expected one of {sorted(export.FORMATS)}")
+    filters = parse_filters(cube, query)
+    states = filters.states if len(filters.states) < len(cube.states) else None
+    try:
+        chunks = export.iter_export(name, fmt, states, filters.year_range, query.get("column"), cube=cube)
+    except ValueError as exc:  # unknown columns
+        raise BadRequest(str(exc))
+    return Stream(chunks, export.FORMATS[fmt][0], export.file_name(name, fmt))
+
+
+def _compute(name, build, filters, cube):
+    result, _, _ = shared_result(name, filters, build, cube)
+    return json.dumps({"data_version": cube.version, "filters": filters._asdict(), "result": result}).encode()
+
+
+async def respond(path, query):
+    """``(status, body)`` for one ``GET``; the body is bytes of JSON or a :class:`Stream`."""
+    if path.startswith(EXPORT_PREFIX):
+        cube = await asyncio.to_thread(load_cube)
+        try:
+            return HTTPStatus.OK, await asyncio.to_thread(export_stream, cube, path[len(EXPORT_PREFIX):], query)
+        except BadRequest as exc:
+            return HTTPStatus.BAD_REQUEST, _error(str(exc))
+    if path == "/health":
+        cube = await asyncio.to_thread(load_cube)
+        return HTTPStatus.OK, json.dumps({"status": "ok", "data_version": cube.version, "coalesced": _coalescer.coalesced}).encode()
+    if path not in ENDPOINTS:
+        return HTTPStatus.NOT_FOUND, _error(f"Unknown path {path!r}; expected one of {sorted(ENDPOINTS) + ['/health']}")
+
+    name, build = ENDPOINTS[path]
+    cube = await asyncio.to_thread(load_cube)
+    if query.get("undivided", ["0"])[-1] not in ("", "0", "false"):
+        cube = await asyncio.to_thread(undivided_cube, cube)
+    try:
+        filters = parse_filters(cube, query)
+    except BadRequest as exc:
+        return HTTPStatus.BAD_REQUEST, _error(str(exc))
+    return HTTPStatus.OK, await _coalescer.run((name, cube.version) + tuple(filters), _compute, name, build, filters, cube)
+
+
+def _error(message):
+    return json.dumps({"error": message}).encode()
+
+
+# -------------------------
+# HTTP
+# -------------------------
+async def _read_request(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    method, target, version = lines[0].split(" ", 2)
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0) or 0)
+    if length:
+        await reader.readexactly(length)  # bodies are ignored (GET only)
+    return method, target, version, headers
+
+
+def _head(status, keep_alive, content_type="application/json", extra=()):
+    headers = [
+        f"HTTP/1.1 {status.value} {status.phrase}",
+        f"Content-Type: {content_type}",
+        *extra,
+        "Access-Control-Allow-Origin: *",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    return ("\r\n".join(headers) + "\r\n\r\n").encode()
+
+
+def _response(status, body, keep_alive, head_only=False):
+    return _head(status, keep_alive, extra=[f"Content-Length: {len(body)}"]) + (b"" if head_only else body)
+
+
+async def _send_stream(writer, stream, keep_alive, chunked, head_only=False):
+    """Write ``stream`` as it is encoded: chunked for HTTP/1.1, else until the connection closes."""
+    extra = [f'Content-Disposition: attachment; filename="{stream.file_name}"']
+    if chunked:
+        extra.append("Transfer-Encoding: chunked")
+    writer.write(_head(HTTPStatus.OK, keep_alive, stream.content_type, extra))
+    if head_only:
+        stream.chunks.close()
+        return
+    try:
+        while (chunk := await asyncio.to_thread(next, stream.chunks, None)) is not None:
+            if chunk:
+                writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk) if chunked else chunk)
+                await writer.drain()  # back-pressure: the next chunk waits for a slow client
+    finally:
+        stream.chunks.close()
+    if chunked:
+        writer.write(b"0\r\n\r\n")
+
+
+async def handle_connection(reader, writer):
+    try:
+        while True:
+            try:
+                method, target, version, headers = await _read_request(reader)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                break
+            except (asyncio.LimitOverrunError, BadRequest, ValueError):
+                writer.write(_response(HTTPStatus.BAD_REQUEST, _error("Malformed request"), False))
+                break
+
+            keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+            if method not in ("GET", "HEAD"):
+                status, body = HTTPStatus.METHOD_NOT_ALLOWED, _error("Only GET is supported")
+            else:
+                url = urlsplit(target)
+                try:
+                    status, body = await respond(url.path.rstrip("/") or "/", parse_qs(url.query))
+                except Exception:
+                    logger.exception("Request failed: %s", target)
+                    status, body = HTTPStatus.INTERNAL_SERVER_ERROR, _error("Internal error")
+
+            if isinstance(body, Stream):
+                # Without chunked encoding (HTTP/1.0) the end of the body is the end of the connection
+                keep_alive &= version == "HTTP/1.1"
+                try:
+                    await _send_stream(writer, body, keep_alive, chunked=version == "HTTP/1.1", head_only=method == "HEAD")
+                except ConnectionError:
+                    break
+                except Exception:
+                    # Headers are out: closing without the last chunk tells the client the body is incomplete
+                    logger.exception("Export failed: %s", target)
+                    break
+            else:
+                writer.write(_response(status, body, keep_alive, head_only=method == "HEAD"))
+            await writer.drain()
+            if not keep_alive:
+                break
+    finally:
+        writer.close()
+
+
+async def serve(host="127.0.0.1", port=8502):
+    await asyncio.to_thread(load_cube)  # warm the shared data before accepting clients
+    server = await asyncio.start_server(handle_connection, host, port, limit=MAX_HEADER_BYTES)
+    logger.info("Serving the KPI API on http://%s:%d", host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m dashboard.api", description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Bounded, process-wide LRU cache shared by every dashboard session.
+
+Entries are serialized payloads (KPI dicts and figure JSON) keyed by the
+canonical filter state, so sessions looking at the same view – typically the
+default "Select All" / full year range – are served from memory instead of
+recomputing. The cache is bounded by the total size of the stored payloads;
+the least recently used entries are evicted first.
+
+The bound is read from ``DASHBOARD_CACHE_MB`` (default 64). Hit, miss and
+eviction counters are available from :meth:`LRUCache.stats` for tuning it.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_MB = float(os.environ.get("DASHBOARD_CACHE_MB", 64))
+
+
+class LRUCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = int(max_bytes)
+        self._entries = OrderedDict()   # key -> (payload, nbytes)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, payload, nbytes):
+        if nbytes > self.max_bytes:
+            return  # would evict everything else; don't cache it
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._entries[key] = (payload, nbytes)
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Shared by every session in this process
+result_cache = LRUCache(DEFAULT_MAX_MB * 1024 * 1024)
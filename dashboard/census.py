@@ -0,0 +1,74 @@
+"""Census 2011 population per state/UT, for per-capita rates.
+
+Populations are keyed on the codes of :mod:`dashboard.states` and held constant
+over every year (there is no later census to interpolate towards). Telangana
+and Ladakh are the Census 2011 counts of the districts that formed them; before
+their split year (``states.SPLITS``) their population is counted in the parent
+state, like their cases are. In the undivided view (``cube.undivided_cube``) they
+are counted in the parent state in every year.
+"""
+
+import numpy as np
+
+from dashboard.states import MAX_CODE, SPLITS
+
+CENSUS_YEAR = 2011
+
+# code -> persons, present-day boundaries (Census of India 2011, final totals)
+POPULATION = {
+    1: 12_267_013,     # Jammu & Kashmir without Ladakh
+    2: 6_864_602,
+    3: 27_743_338,
+    4: 1_055_450,
+    5: 10_086_292,
+    6: 25_351_462,
+    7: 16_787_941,
+    8: 68_548_437,
+    9: 199_812_341,
+    10: 104_099_452,
+    11: 610_577,
+    12: 1_383_727,
+    13: 1_978_502,
+    14: 2_855_794,
+    15: 1_097_206,
+    16: 3_673_917,
+    17: 2_966_889,
+    18: 31_205_576,
+    19: 91_276_115,
+    20: 32_988_134,
+    21: 41_974_218,
+    22: 25_545_198,
+    23: 72_626_809,
+    24: 60_439_692,
+    25: 243_247,
+    26: 343_709,
+    27: 112_374_333,
+    28: 49_577_103,    # Andhra Pradesh without Telangana
+    29: 61_095_297,
+    30: 1_458_545,
+    31: 64_473,
+    32: 33_406_061,
+    33: 72_147_030,
+    34: 1_247_953,
+    35: 380_581,
+    36: 35_003_674,
+    37: 274_289,
+}
+
+
+def population(state_codes, years, undivided=False):
+    """(states × years) population within each state's boundaries of that year (or before any split)."""
+    by_code = np.zeros(MAX_CODE + 1, dtype=np.float64)
+    for code, persons in POPULATION.items():
+        by_code[code] = persons
+    pop = np.repeat(by_code[np.asarray(state_codes, dtype=np.intp)][:, None], len(years), axis=1)
+
+    position = {int(code): i for i, code in enumerate(state_codes)}
+    years = np.asarray(years)
+    for child, (parent, split_year) in SPLITS.items():
+        before = np.ones(len(years), dtype=bool) if undivided else years < split_year
+        if child in position:
+            pop[position[child], before] = 0
+        if parent in position:
+            pop[position[parent], before] += POPULATION[child]
+    return pop
@@ -0,0 +1,414 @@
+"""Dense state × year × category aggregate cube built once per data version.
+
+Every KPI and chart in the dashboard is a sum over some slice of the same
+numbers, so instead of re-running ``groupby`` on filtered frames each rerun the
+two sources are folded into one NumPy array at load time:
+
+* axis 0 – state/UT: the canonical states present in either source, ordered by
+  name (``states``) with their integer codes alongside (``state_codes``)
+* axis 1 – year (contiguous, ``min_year`` … ``max_year``)
+* axis 2 – category: the five offender categories (1999-2013) followed by
+  ``Cases_Reported`` (2015-2020)
+
+The cells are scattered from the long-format fact table of both sources
+(:mod:`dashboard.facts`), one fact per (state, year, category). ``present``
+marks the cells that came from an actual CSV row, so years and
+states without data (e.g. 2014) stay out of per-year/per-state series exactly
+like they did with ``groupby``.
+
+Year-range queries go through prefix sums along the year axis (per state and
+category, plus a national roll-up), so any ``(start, end)`` window total is two
+lookups and a subtraction regardless of how many years are loaded.
+
+The offender-category correlation is served the same way: per (state, year)
+cell the cube keeps the sufficient statistics – cell count, the five values and
+their pairwise products – as prefix sums, so a Pearson matrix for any filter is
+a range difference plus a 5×5 normalization (per state in the same pass).
+"""
+
+import itertools
+import threading
+
+import numpy as np
+import pandas as pd
+
+from dashboard import states as state_table
+from dashboard import shared, store
+from dashboard.data import ASSAULT, OFFENDER_CATEGORIES, SUMMARY, appended_rows, load_assault_data, load_summary_data
+from dashboard.facts import CASES_REPORTED, CATEGORIES, fact_table
+
+
+class AggregateCube:
+    # Bumped each time a cube is built; lets caches tell data versions apart
+    version = 0
+
+    # True for the view of undivided_cube, where split-off states are folded into their parent
+    undivided = False
+
+    # Everything a cube is made of; enough to reattach one without recomputing (see dashboard.shared)
+    ARRAYS = ("state_codes", "years", "values", "present", "prefix", "present_prefix", "national_prefix",
+              "moment_count_prefix", "moment_sum_prefix", "moment_cross_prefix")
+
+    def __init__(self, state_codes, years, values, present, index=None):
+        self.state_codes = state_codes
+        self.states = np.array([state_table.STATES[code] for code in state_codes], dtype=object)
+        self.years = years
+        self.values = values
+        self.present = present
+        self._state_pos = {name: i for i, name in enumerate(self.states)}
+        self._category_pos = {name: i for i, name in enumerate(CATEGORIES)}
+
+        if index is not None:  # precomputed (e.g. memory-mapped) prefix arrays
+            for name in self.ARRAYS[4:]:
+                setattr(self, name, index[name])
+            return
+
+        # Range-query index: prefix[:, k] is the sum over the first k years (prefix[:, 0] == 0)
+        pad = ((0, 0), (1, 0), (0, 0))
+        self.prefix = np.pad(values.cumsum(axis=1), pad)
+        self.present_prefix = np.pad(present.cumsum(axis=1, dtype=np.int32), pad)
+        self.national_prefix = self.prefix.sum(axis=0)
+
+        # Correlation moments over the offender categories, one observation per present cell
+        k = len(OFFENDER_CATEGORIES)
+        observed = present[:, :, :k].all(axis=2)
+        x = np.where(observed[:, :, None], values[:, :, :k], 0).astype(np.float64)
+        self.moment_count_prefix = np.pad(observed.cumsum(axis=1, dtype=np.int32), ((0, 0), (1, 0)))
+        self.moment_sum_prefix = np.pad(x.cumsum(axis=1), pad)
+        self.moment_cross_prefix = np.pad((x[:, :, :, None] * x[:, :, None, :]).cumsum(axis=1), pad + ((0, 0),))
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Cube over ``arrays`` (as named in ``ARRAYS``) as they are: nothing is copied or recomputed."""
+        return cls(arrays["state_codes"], arrays["years"], arrays["values"], arrays["present"], index=arrays)
+
+    def arrays(self):
+        return {name: getattr(self, name) for name in self.ARRAYS}
+
+    @property
+    def min_year(self):
+        return int(self.years[0])
+
+    @property
+    def max_year(self):
+        return int(self.years[-1])
+
+    # -------------------------
+    # Index helpers
+    # -------------------------
+    def state_index(self, states=None):
+        if states is None:
+            return np.arange(len(self.states))
+        return np.array([self._state_pos[s] for s in states if s in self._state_pos], dtype=np.intp)
+
+    def category_index(self, categories=None):
+        if categories is None:
+            return np.arange(len(CATEGORIES))
+        return np.array([self._category_pos[c] for c in categories], dtype=np.intp)
+
+    def year_slice(self, year_range):
+        start = min(max(year_range[0], self.min_year) - self.min_year, len(self.years))
+        end = min(year_range[1], self.max_year) - self.min_year
+        return slice(start, max(end + 1, start))
+
+    # -------------------------
+    # Range queries (prefix sums)
+    # -------------------------
+    def _range_bounds(self, year_range):
+        y_sl = self.year_slice(year_range)
+        return y_sl.start, y_sl.stop
+
+    def range_totals(self, year_range, states=None, categories=None):
+        """(states × categories) totals over the inclusive ``year_range``."""
+        lo, hi = self._range_bounds(year_range)
+        c_idx = self.category_index(categories)
+        if states is None:
+            return (self.prefix[:, hi] - self.prefix[:, lo])[:, c_idx]
+        s_idx = self.state_index(states)
+        return (self.prefix[s_idx, hi] - self.prefix[s_idx, lo])[:, c_idx]
+
+    def range_row_counts(self, year_range, states=None, categories=None):
+        """(states × categories) number of rows backing each range total."""
+        lo, hi = self._range_bounds(year_range)
+        s_idx, c_idx = self.state_index(states), self.category_index(categories)
+        return (self.present_prefix[s_idx, hi] - self.present_prefix[s_idx, lo])[:, c_idx]
+
+    def row_count(self, states=None, year_range=(0, 9999), categories=None):
+        """Number of (state, year, category) cells backed by a CSV row in the selection."""
+        return int(self.range_row_counts(year_range, states, categories).sum())
+
+    def _select(self, states, year_range, categories):
+        s_idx, c_idx, y_sl = self.state_index(states), self.category_index(categories), self.year_slice(year_range)
+        values = self.values[s_idx, y_sl][:, :, c_idx]
+        present = self.present[s_idx, y_sl][:, :, c_idx]
+        return values, present, s_idx, y_sl
+
+    # -------------------------
+    # Reductions
+    # -------------------------
+    def total(self, states=None, year_range=(0, 9999), categories=None):
+        if states is None:
+            lo, hi = self._range_bounds(year_range)
+            return int((self.national_prefix[hi] - self.national_prefix[lo])[self.category_index(categories)].sum())
+        return int(self.range_totals(year_range, states, categories).sum())
+
+    def yearly_totals(self, states=None, year_range=(0, 9999), categories=None):
+        """Total per year, for years with at least one row in the selection."""
+        values, present, _, y_sl = self._select(states, year_range, categories)
+        mask = present.any(axis=(0, 2))
+        return pd.Series(values.sum(axis=(0, 2))[mask], index=pd.Index(self.years[y_sl][mask], name="Year"))
+
+    def state_totals(self, states=None, year_range=(0, 9999), categories=None):
+        """Total per state/UT, for states with at least one row in the selection."""
+        s_idx = self.state_index(states)
+        totals = self.range_totals(year_range, states, categories).sum(axis=1)
+        mask = self.range_row_counts(year_range, states, categories).any(axis=1)
+        return pd.Series(totals[mask], index=pd.Index(self.states[s_idx][mask], name="State/UT"))
+
+    def yearly_by_category(self, states=None, year_range=(0, 9999), categories=None):
+        """Year × category frame, for years with at least one row in the selection."""
+        categories = list(OFFENDER_CATEGORIES) if categories is None else list(categories)
+        values, present, _, y_sl = self._select(states, year_range, categories)
+        mask = present.any(axis=(0, 2))
+        return pd.DataFrame(values.sum(axis=0)[mask], index=pd.Index(self.years[y_sl][mask], name="YEAR"), columns=categories)
+
+    def category_totals(self, states=None, year_range=(0, 9999), categories=None):
+        categories = list(OFFENDER_CATEGORIES) if categories is None else list(categories)
+        return pd.Series(self.range_totals(year_range, states, categories).sum(axis=0), index=categories)
+
+    def cells(self, states=None, year_range=(0, 9999), categories=None):
+        """(rows × categories) matrix of the present (state, year) cells – one row per CSV row."""
+        categories = list(OFFENDER_CATEGORIES) if categories is None else list(categories)
+        values, present, _, _ = self._select(states, year_range, categories)
+        mask = present.all(axis=2)
+        return pd.DataFrame(values[mask], columns=categories)
+
+    # -------------------------
+    # Correlation
+    # -------------------------
+    def moments(self, year_range, states=None, categories=None):
+        """Per-state ``(count, sums, cross-products)`` of the offender-category cells in ``year_range``."""
+        lo, hi = self._range_bounds(year_range)
+        s_idx, c_idx = self.state_index(states), self.category_index(categories)
+        count = self.moment_count_prefix[s_idx, hi] - self.moment_count_prefix[s_idx, lo]
+        sums = (self.moment_sum_prefix[s_idx, hi] - self.moment_sum_prefix[s_idx, lo])[:, c_idx]
+        cross = (self.moment_cross_prefix[s_idx, hi] - self.moment_cross_prefix[s_idx, lo])[:, c_idx][:, :, c_idx]
+        return count, sums, cross
+
+    def correlation(self, states=None, year_range=(0, 9999), categories=None, method="pearson", by_state=False):
+        """Offender-category correlation over the selected cells: ``(k × k)``, or ``(states × k × k)`` with ``by_state``.
+
+        ``method="pearson"`` reduces the precomputed moments; ``method="rank"``
+        (Spearman) ranks the selected cells first, since ranks depend on the
+        selection. Pairs with no variance are NaN.
+        """
+        if method == "pearson":
+            count, sums, cross = self.moments(year_range, states, categories)
+        elif method == "rank":
+            count, sums, cross = self._rank_moments(states, year_range, categories, by_state)
+        else:
+            raise ValueError(f"Unknown correlation method {method!r}; expected 'pearson' or 'rank'")
+        if not by_state:
+            count, sums, cross = count.sum(axis=0), sums.sum(axis=0), cross.sum(axis=0)
+        return _pearson(count, sums, cross)
+
+    def _rank_moments(self, states, year_range, categories, by_state):
+        values, present, _, _ = self._select(states, year_range, categories)
+        observed = present.all(axis=2)
+        n_states, n_years, k = values.shape
+        x = np.where(observed[:, :, None], values, np.nan)
+        # Average ranks (ties share one) per column: within each state, or across all selected cells
+        if by_state:
+            ranks = pd.DataFrame(x.transpose(1, 0, 2).reshape(n_years, -1)).rank().to_numpy().reshape(n_years, n_states, k).transpose(1, 0, 2)
+        else:
+            ranks = pd.DataFrame(x.reshape(-1, k)).rank().to_numpy().reshape(n_states, n_years, k)
+        ranks = np.nan_to_num(ranks)
+        return observed.sum(axis=1), ranks.sum(axis=1), np.einsum("syk,syl->skl", ranks, ranks)
+
+
+def _pearson(count, sums, cross):
+    """Correlation matrices from moments; leading axes (e.g. per state) are kept."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        n = count[..., None, None].astype(np.float64)
+        cov = cross / n - (sums[..., :, None] / n) * (sums[..., None, :] / n)
+        std = np.sqrt(np.diagonal(cov, axis1=-2, axis2=-1))
+        corr = cov / (std[..., :, None] * std[..., None, :])
+    return np.clip(corr, -1.0, 1.0)
+
+
+# -------------------------
+# Construction
+# -------------------------
+def _fill(values, present, facts, state_pos, min_year):
+    # Facts are unique per (state, year, category), so a plain fancy-indexed add is exact
+    idx = (state_pos[facts["state_code"].to_numpy(dtype=np.intp)],
+           facts["year"].to_numpy(dtype=np.intp) - min_year,
+           facts["category_code"].to_numpy(dtype=np.intp))
+    values[idx] += facts["count"].to_numpy(dtype=np.int64)
+    present[idx] = True
+
+
+def _state_axis(codes):
+    """``(state_codes, state_pos)``: the state axis ordered by name, and code -> position."""
+    state_codes = np.array(sorted(codes, key=state_table.STATES.get), dtype=np.int8)
+    # integer join: state code -> position on the state axis
+    state_pos = np.full(state_table.MAX_CODE + 1, -1, dtype=np.intp)
+    state_pos[state_codes] = np.arange(len(state_codes))
+    return state_codes, state_pos
+
+
+def _empty(state_codes, years):
+    shape = (len(state_codes), len(years), len(CATEGORIES))
+    return np.zeros(shape, dtype=np.int64), np.zeros(shape, dtype=bool)
+
+
+def build_cube(df, df1):
+    """Cube over the 1999-2013 rows ``df`` and 2015-2020 rows ``df1``, scattered from their facts."""
+    facts = fact_table(df, df1)
+    state_codes, state_pos = _state_axis(set(facts["state_code"].unique().tolist()))
+    years = np.arange(int(facts["year"].min()), int(facts["year"].max()) + 1)
+
+    values, present = _empty(state_codes, years)
+    _fill(values, present, facts, state_pos, years[0])
+    return AggregateCube(state_codes, years, values, present)
+
+
+def extend_cube(cube, df, df1):
+    """``cube`` plus the rows in ``df`` / ``df1`` (appended to each source since it was built).
+
+    Only the new rows are scattered; the old cells are copied across, widening
+    the state and year axes when the rows bring a new state/UT or year.
+    """
+    facts = fact_table(df, df1)
+    state_codes, state_pos = _state_axis(set(cube.state_codes.tolist()).union(facts["state_code"].unique().tolist()))
+    bounds = [cube.min_year, cube.max_year] + ([int(facts["year"].min()), int(facts["year"].max())] if len(facts) else [])
+    years = np.arange(min(bounds), max(bounds) + 1)
+
+    values, present = _empty(state_codes, years)
+    s_idx = state_pos[cube.state_codes]
+    y_sl = slice(cube.min_year - years[0], cube.max_year - years[0] + 1)
+    values[s_idx, y_sl] = cube.values
+    present[s_idx, y_sl] = cube.present
+    _fill(values, present, facts, state_pos, years[0])
+
+    return AggregateCube(state_codes, years, values, present)
+
+
+_cache = {}
+_lock = threading.Lock()
+_versions = itertools.count(1)
+
+
+def load_cube():
+    """Cube for the currently loaded data (see :func:`source_cube`).
+
+    With ``DASHBOARD_SHARED_DIR`` set, the cube published there by
+    :mod:`dashboard.shared` is attached instead: memory-mapped, read-only and
+    shared with the other processes on the host.
+    """
+    if not shared.ENABLED:
+        return source_cube()
+    key = ("shared", shared.version_key())
+    cached = _cache.get("shared")
+    if cached is None or cached[0] != key:
+        with _lock:
+            cached = _cache.get("shared")
+            if cached is None or cached[0] != key:
+                version, arrays = shared.attach_arrays()
+                cube = AggregateCube.from_arrays(arrays)
+                cube.version = next(_versions)
+                cached = _cache["shared"] = (key, cube, version)
+    return cached[1]
+
+
+def source_cube():
+    """Cube built from the sources themselves; rebuilt only when a source file changes.
+
+    With ``DASHBOARD_BACKEND=parquet`` the cube is built from per-(state, year)
+    sums computed out of core by :mod:`dashboard.store` instead of the frames.
+    A change made by ``python -m dashboard.ingest`` (rows appended to a source)
+    extends the current cube with just those rows.
+    """
+    if store.BACKEND == "parquet":
+        frames, key = None, ("parquet", store.dataset_version())
+    else:
+        frames = (load_assault_data(), load_summary_data())
+        key = (id(frames[0]), id(frames[1]))
+    cached = _cache.get("cube")
+    if cached is None or cached[0] != key:
+        with _lock:
+            cached = _cache.get("cube")
+            if cached is None or cached[0] != key:
+                if frames is None:
+                    cube, frames = _load_dataset(cached)
+                else:
+                    cube = _extend(cached, frames)
+                    cube = build_cube(*frames) if cube is None else cube
+                # keep the frames referenced so their ids stay unique while cached
+                cube.version = next(_versions)
+                cached = _cache["cube"] = (key, cube, frames)
+    return cached[1]
+
+
+def _extend(cached, frames):
+    """The cached cube extended to ``frames``, or ``None`` if they are not appends to its frames."""
+    if cached is None:
+        return None
+    tails = []
+    for source, frame, since in zip((ASSAULT, SUMMARY), frames, cached[2]):
+        tail = frame.iloc[:0] if frame is since else appended_rows(source, frame, since)
+        if tail is None:
+            return None
+        tails.append(tail)
+    return extend_cube(cached[1], *tails)
+
+
+def _load_dataset(cached):
+    """``(cube, manifest position)`` for the Parquet dataset, aggregating only appended files when possible."""
+    manifest = store.read_manifest()
+    position = (manifest.get("id"), manifest.get("generation", 0))
+    if cached is not None and position[0] is not None and cached[2][0] == position[0]:
+        files = store.appended_files(manifest, since=cached[2][1])
+        tails = [store.aggregate(source, files=files.get(name, [])) for name, source in store.SOURCES.items()]
+        return extend_cube(cached[1], *tails), position
+    return build_cube(store.aggregate(ASSAULT), store.aggregate(SUMMARY)), position
+
+
+# -------------------------
+# Undivided View
+# -------------------------
+def _undivided(cube):
+    codes = np.array([state_table.undivided_code(int(code)) for code in cube.state_codes], dtype=np.intp)
+    state_codes, state_pos = _state_axis(set(codes.tolist()))
+    values, present = _empty(state_codes, cube.years)
+    np.add.at(values, state_pos[codes], cube.values)
+    np.logical_or.at(present, state_pos[codes], cube.present)
+    view = AggregateCube(state_codes, cube.years, values, present)
+    view.undivided = True
+    return view
+
+
+def undivided_cube(cube):
+    """``cube`` with every split-off state/UT folded into the state it was split from.
+
+    Telangana's rows count towards Andhra Pradesh and Ladakh's towards Jammu &
+    Kashmir in every year, so a state's series covers the same area before and
+    after a split (see ``states.SPLITS``). Built once per data version.
+    """
+    cached = _cache.get("undivided")
+    if cached is None or cached[0] != cube.version:
+        with _lock:
+            cached = _cache.get("undivided")
+            if cached is None or cached[0] != cube.version:
+                view = _undivided(cube)
+                view.version = next(_versions)
+                cached = _cache["undivided"] = (cube.version, view)
+    return cached[1]
+
+
+def undivided_states(states):
+    """``states`` (names, or ``None`` for all) as the undivided states that contain them."""
+    if states is None:
+        return None
+    codes = {state_table.undivided_code(state_table.state_code(name)) for name in states}
+    return tuple(sorted(state_table.STATES[code] for code in codes))
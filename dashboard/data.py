@@ -0,0 +1,389 @@
+"""Typed, process-wide cached loaders for the two NCRB CSV sources.
+
+Streamlit re-executes ``main.py`` on every widget change, but imported modules
+stay in memory for the lifetime of the server process. Each source is therefore
+parsed once per process into a compact frame and shared by every session:
+
+* ``STATE/UT`` / ``State/UT`` as ``category`` of canonical names, plus
+  ``STATE_CODE`` (``int8``, see :mod:`dashboard.states`)
+* ``YEAR`` / ``Year`` as ``int16``
+* case counts as ``int32``
+
+State names are canonicalized during that one parse: aliases ("Orissa",
+"A&N Islands", "Delhi UT", ...) are folded into one spelling, and rows that
+are not a state/UT (the 1999 totals and city-wise block) are dropped.
+
+That parse also checks the file against its declared schema (:class:`Source`):
+exactly the declared columns, integer years and counts that fit their types,
+no missing or negative counts, only known state/UT names and one row per
+(state/UT, year) – unless ``DASHBOARD_REPEATED_KEYS=1`` declares district-level
+data. A file that does not match raises :class:`SchemaError` listing the
+problems with their CSV lines.
+
+A Parquet snapshot of the typed frame is kept next to the data (``.snapshots/``)
+so a fresh process can skip the CSV parse. The in-process entry is keyed on the
+CSV's mtime and size; the on-disk snapshot is keyed on a hash of its contents.
+When ``python -m dashboard.ingest`` appends a year, it also leaves a delta
+snapshot of just the new rows, so running processes extend their frame (and
+the cube, see :func:`appended_rows`) instead of reloading it.
+
+The frames returned here are shared between sessions – treat them as read-only.
+"""
+
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from dashboard import states
+
+try:
+    import pyarrow  # noqa: F401  (only needed for the Parquet snapshots)
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+
+# -------------------------
+# Locations
+# -------------------------
+DATA_DIR = Path(os.environ.get("DASHBOARD_DATA_DIR", Path(__file__).resolve().parent.parent))
+SNAPSHOT_DIR = Path(os.environ.get("DASHBOARD_SNAPSHOT_DIR", DATA_DIR / ".snapshots"))
+
+# Bump when the shape of the typed frames changes, so old snapshots are ignored
+SNAPSHOT_VERSION = 2
+
+STATE_CODE = "STATE_CODE"
+
+# District-level sources carry several rows per (state/UT, year); state-wise ones must not
+REPEATED_KEYS = os.environ.get("DASHBOARD_REPEATED_KEYS", "").lower() in ("1", "true", "yes")
+
+
+# -------------------------
+# Source Schemas
+# -------------------------
+OFFENDER_CATEGORIES = ['Known_To_The_Victims', 'Parents_Close_Family_Members', 'Relatives', 'Neighbours', 'Other_Known_Persons']
+
+
+@dataclass(frozen=True)
+class Source:
+    file_name: str
+    state_col: str
+    year_col: str
+    count_cols: tuple
+
+    @property
+    def path(self):
+        return DATA_DIR / self.file_name
+
+    @property
+    def columns(self):
+        return (self.state_col, self.year_col) + self.count_cols
+
+    @property
+    def dtypes(self):
+        dtypes = {self.state_col: "category", self.year_col: "int16"}
+        dtypes.update({col: "int32" for col in self.count_cols})
+        return dtypes
+
+
+# Dataset for 1999-2013
+ASSAULT = Source("Cleaned State wise Sexual Assault (Detailed) 1999 - 2013.csv", "STATE/UT", "YEAR", tuple(OFFENDER_CATEGORIES))
+# Dataset for 2015-2020
+SUMMARY = Source("Cleaned Summary of cases (rape) 2015-2020.csv", "State/UT", "Year", ("Cases_Reported",))
+
+
+# -------------------------
+# Schema Validation
+# -------------------------
+class SchemaError(ValueError):
+    """Rows that do not match their source's declared schema; ``problems`` lists every violation."""
+
+    def __init__(self, problems):
+        self.problems = list(problems)
+        super().__init__("; ".join(self.problems))
+
+
+def _lines(mask, limit=5):
+    """CSV line numbers (header is line 1) of the rows where the boolean Series ``mask`` is true."""
+    rows = mask.index[mask.to_numpy(dtype=bool)] + 2
+    listed = ", ".join(str(row) for row in rows[:limit])
+    return f"line{'s' if len(rows) > 1 else ''} {listed}{', ...' if len(rows) > limit else ''}"
+
+
+def _cell_problems(text, source):
+    """Missing, non-integer and out-of-range cells of the all-string frame ``text``."""
+    problems = []
+    if text[source.state_col].isna().any():
+        problems.append(f"{source.state_col}: missing on {_lines(text[source.state_col].isna())}")
+    for col in (source.year_col,) + source.count_cols:
+        values = pd.to_numeric(text[col], errors="coerce")
+        info = np.iinfo(source.dtypes[col])
+        checks = (
+            ("missing", text[col].isna()),
+            ("not an integer", text[col].notna() & (values.isna() | (values % 1 != 0))),
+            ("out of range", (values < info.min) | (values > info.max)),
+        )
+        problems += [f"{col}: {what} on {_lines(mask)}" for what, mask in checks if mask.any()]
+    return problems
+
+
+def _narrow(wide, source):
+    """The int64-parsed ``wide`` rows cast to ``source.dtypes``, once every value fits."""
+    problems = []
+    for col in (source.year_col,) + source.count_cols:
+        info = np.iinfo(source.dtypes[col])
+        outside = (wide[col] < info.min) | (wide[col] > info.max)
+        if outside.any():
+            problems.append(f"{col}: out of range on {_lines(outside)}")
+    if problems:
+        raise SchemaError(problems)
+    return wide.astype(source.dtypes)
+
+
+def read_source_csv(path, source, chunk_rows=None):
+    """Rows of the CSV at ``path`` in ``source``'s declared columns and types; raises :class:`SchemaError`.
+
+    Years and counts are parsed as int64 and range-checked before they are
+    narrowed, so an oversized value is reported instead of wrapping around.
+    With ``chunk_rows`` the rows come as an iterator of typed chunks (their
+    index is the row position in the file, so problems name the right lines).
+    """
+    header = list(pd.read_csv(path, nrows=0).columns)
+    missing = [col for col in source.columns if col not in header]
+    extra = [col for col in header if col not in source.columns]
+    if missing or extra:
+        raise SchemaError([f"columns differ from {source.file_name} (missing {missing}, unexpected {extra})"])
+
+    chunks = _typed_chunks(path, source, chunk_rows)
+    return chunks if chunk_rows else next(chunks)
+
+
+def _typed_chunks(path, source, chunk_rows):
+    wide = {col: "int64" for col in (source.year_col,) + source.count_cols}
+    try:
+        reader = pd.read_csv(path, dtype={source.state_col: "category", **wide}, chunksize=chunk_rows)
+        for chunk in reader if chunk_rows else [reader]:
+            yield _narrow(chunk[list(source.columns)], source)
+    except SchemaError:
+        raise
+    except (ValueError, OverflowError):
+        # Re-read as text only to say which cells are wrong
+        text = pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[""])
+        raise SchemaError(_cell_problems(text, source) or [f"{path}: unreadable"]) from None
+
+
+def _state_lookup(frame, source):
+    """``(lookup, problems)``: the code of every distinct state name in ``frame`` (None for non-state rows), and any missing or unknown names."""
+    names = frame[source.state_col]
+    problems = []
+    if names.isna().any():
+        problems.append(f"{source.state_col}: missing on {_lines(names.isna())}")
+    lookup, unknown = {}, []
+    for name in names.dropna().astype(str).unique():
+        try:
+            lookup[name] = states.state_code(name)
+        except states.UnknownStateError:
+            unknown.append(name)
+    if unknown:
+        problems.append(f"{source.state_col}: unknown state/UT names {sorted(unknown)}; add them to dashboard/states.py")
+    return lookup, problems
+
+
+def repeated_keys(typed, source, seen=None):
+    """(state/UT, year) pairs that occur more than once in the canonicalized ``typed`` rows.
+
+    Pass the same ``seen`` set to every call when a file is checked in chunks:
+    it carries the keys of the earlier chunks.
+    """
+    keys = typed[STATE_CODE].to_numpy(dtype=np.int64) << 16 | typed[source.year_col].to_numpy(dtype=np.int64)
+    repeated = pd.Series(keys).duplicated(keep=False).to_numpy(copy=True)
+    if seen is not None:
+        repeated |= np.isin(keys, list(seen))
+        seen.update(np.unique(keys).tolist())
+    pairs = zip(typed.loc[repeated, source.state_col].astype(str), typed.loc[repeated, source.year_col].tolist())
+    return sorted(set(pairs))
+
+
+def validate_rows(frame, source, unique_keys=None, city_block_years=None):
+    """Canonicalized ``frame`` (typed as ``source.dtypes``) after the row-level schema checks.
+
+    Counts must be non-negative and every name a state/UT (or a known
+    non-state row) of :mod:`dashboard.states`. With ``unique_keys`` (by
+    default unless ``DASHBOARD_REPEATED_KEYS`` is set) each (state/UT, year)
+    may appear once; otherwise repeated keys (district-level rows) are allowed
+    and summed downstream. ``city_block_years`` is passed on to
+    :func:`canonicalize_states` when a file is validated in chunks.
+    """
+    problems = []
+    for col in source.count_cols:
+        negative = frame[col] < 0
+        if negative.any():
+            problems.append(f"{col}: negative count on {_lines(negative)}")
+    problems += _state_lookup(frame, source)[1]
+    if problems:
+        raise SchemaError(problems)
+
+    typed = canonicalize_states(frame, source, city_block_years)
+    if (not REPEATED_KEYS if unique_keys is None else unique_keys):
+        pairs = repeated_keys(typed, source)
+        if pairs:
+            raise SchemaError([repeated_problem(pairs)])
+    return typed
+
+
+def repeated_problem(pairs):
+    """Schema problem line for the repeated (state/UT, year) ``pairs``."""
+    return f"repeated (state/UT, year) rows: {pairs[:5]}{' ...' if len(pairs) > 5 else ''} (set DASHBOARD_REPEATED_KEYS=1 for district-level data)"
+
+
+# -------------------------
+# Process-wide Cache
+# -------------------------
+_cache = {}
+_lock = threading.Lock()
+
+
+def _file_key(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def content_hash(path, appended=b""):
+    """Hash of the file's contents (as they will be once ``appended`` is added to the end)."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    digest.update(appended)
+    return digest.hexdigest()[:16]
+
+
+def snapshot_path(source, digest):
+    """Snapshot of ``source``'s typed rows for the CSV whose :func:`content_hash` is ``digest``."""
+    return SNAPSHOT_DIR / f"{Path(source.file_name).stem}-v{SNAPSHOT_VERSION}-{digest}.parquet"
+
+
+def delta_path(source, from_hash, to_hash):
+    """Snapshot of just the rows an ingest appended, taking the CSV from ``from_hash`` to ``to_hash``."""
+    return SNAPSHOT_DIR / f"{Path(source.file_name).stem}-v{SNAPSHOT_VERSION}-{from_hash}-{to_hash}.delta.parquet"
+
+
+def write_snapshot(frame, path):
+    """Atomically write ``frame`` as a Parquet snapshot; False on a read-only checkout."""
+    try:
+        SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        frame.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+    except OSError:
+        return False
+    return True
+
+
+def canonicalize_states(frame, source, city_block_years=None):
+    """Resolve state names to canonical names and codes; drop totals and the city-wise block.
+
+    When a file is canonicalized in chunks, pass the same ``city_block_years``
+    set to every call: it carries the years whose city-wise block has started.
+    """
+    lookup, problems = _state_lookup(frame, source)
+    if problems:
+        raise SchemaError(problems)
+    raw = frame[source.state_col].astype(str)
+
+    # Positional: the city rows after the all-India total reuse state names (e.g. the 1999 "Delhi" city row)
+    marker = raw.map({name: states.is_city_block_marker(name) for name in lookup})
+    year = frame[source.year_col].to_numpy()
+    city_block = marker.groupby(year).cummax()
+    if city_block_years is not None:
+        city_block |= np.isin(year, list(city_block_years))
+        city_block_years.update(np.unique(year[marker.to_numpy(dtype=bool)]).tolist())
+
+    codes = raw.map(lookup)
+    keep = (codes.notna() & ~city_block).to_numpy()
+    frame = frame[keep].copy()
+    codes = codes[keep].astype("int8").to_numpy()
+
+    frame[STATE_CODE] = codes
+    names = sorted(states.STATES.values())
+    position = np.zeros(states.MAX_CODE + 1, dtype=np.int8)
+    position[[code for code, _ in sorted(states.STATES.items(), key=lambda item: item[1])]] = np.arange(len(names))
+    frame[source.state_col] = pd.Categorical.from_codes(position[codes], categories=names)
+    return frame.reset_index(drop=True)
+
+
+def _parse(source, previous=None):
+    """``(frame, content hash, base)`` for ``source`` from its snapshots or the CSV.
+
+    When ``previous`` (the cache entry being replaced) is what an ingest
+    appended to, only the appended rows are read and ``base`` records
+    ``(id of the previous frame, its row count)``.
+    """
+    if not HAS_PARQUET:
+        return validate_rows(read_source_csv(source.path, source), source), None, None
+
+    digest = content_hash(source.path)
+    if previous is not None and previous[2] is not None:
+        delta = delta_path(source, previous[2], digest)
+        if delta.exists():
+            old = previous[1]
+            return extend_frame(source, old, pd.read_parquet(delta)), digest, (id(old), len(old))
+
+    snapshot = snapshot_path(source, digest)
+    if snapshot.exists():
+        return pd.read_parquet(snapshot), digest, None
+
+    frame = validate_rows(read_source_csv(source.path, source), source)
+    write_snapshot(frame, snapshot)  # read-only checkout: keep serving from memory
+    return frame, digest, None
+
+
+def extend_frame(source, frame, rows):
+    """``frame`` with the typed ``rows`` appended; the state column stays a sorted categorical."""
+    combined = pd.concat([frame, rows], ignore_index=True)
+    combined[source.state_col] = union_categoricals([frame[source.state_col], rows[source.state_col]], sort_categories=True)
+    return combined
+
+
+def load(source):
+    """Return the typed frame for ``source``; parsed at most once per file version."""
+    key = _file_key(source.path)
+    cached = _cache.get(source.file_name)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    with _lock:
+        cached = _cache.get(source.file_name)
+        if cached is None or cached[0] != key:
+            cached = (key,) + _parse(source, cached)
+            _cache[source.file_name] = cached
+    return cached[1]
+
+
+def appended_rows(source, frame, since):
+    """Rows an ingest appended to ``since`` to give ``frame``; ``None`` unless ``frame`` is such an extension."""
+    cached = _cache.get(source.file_name)
+    if cached is None or cached[1] is not frame or cached[3] is None or cached[3][0] != id(since):
+        return None
+    return frame.iloc[cached[3][1]:]
+
+
+def load_assault_data():
+    """1999-2013 state-wise sexual assault cases by offender category."""
+    return load(ASSAULT)
+
+
+def load_summary_data():
+    """2015-2020 state-wise summary of reported rape cases."""
+    return load(SUMMARY)
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
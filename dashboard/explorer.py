@@ -0,0 +1,110 @@
+"""Client-side filtering: the state × year aggregates shipped once, the charts redrawn in the browser.
+
+With the default sidebar every step of a year-slider drag and every edit of the
+36-entry state multiselect is a server round trip and a script rerun. With
+``DASHBOARD_FILTER_MODE=client`` those two filters move into an explorer
+component (``map_frontend/explorer.html``) instead:
+
+* :func:`explorer_payload` reduces the cube to what the line, bar and map
+  charts read – per state/UT and year the offender-category total (1999-2013)
+  and ``Cases_Reported`` (2015-2020), ``null`` where no row exists – plus the
+  states each boundary feature covers (no features, and no map, while the
+  boundary assets are not built). It is written once per data version as
+  a content-addressed JSON file next to the component, so the browser
+  downloads it once and caches it;
+* the year range and state selection are edited in the component, which
+  re-filters those arrays and redraws the three charts locally (the same
+  reductions as :func:`dashboard.figures.yearly_trend_figure`, the default
+  ranking of :func:`~dashboard.figures.state_bars_figure` and
+  :func:`~dashboard.figures.choropleth_values`);
+* the selection is sent back (``{"states", "year_range"}``) only once the
+  controls have been idle for ``DEBOUNCE_MS``, and only if it changed. That
+  one rerun updates what needs the server: the KPIs, the category sections and
+  the trend overlay (drawn from the server's figure, hidden while the local
+  selection differs from the synced one).
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+from dashboard import map_component
+from dashboard.cube import CASES_REPORTED, OFFENDER_CATEGORIES
+from dashboard.geo import feature_codes, state_names
+
+CLIENT = os.environ.get("DASHBOARD_FILTER_MODE", "server").lower() == "client"
+
+DEBOUNCE_MS = 600
+
+
+# -------------------------
+# Payload (once per data version)
+# -------------------------
+def _source_totals(cube, categories):
+    """(states × years) totals over ``categories``, None where the cell has no row."""
+    c_idx = cube.category_index(categories)
+    totals = np.asarray(cube.values)[:, :, c_idx].sum(axis=2)
+    present = np.asarray(cube.present)[:, :, c_idx].any(axis=2)
+    return [[int(v) if p else None for v, p in zip(row, mask)] for row, mask in zip(totals, present)]
+
+
+def explorer_payload(cube, india_geo):
+    """Everything the explorer needs to filter and draw the line, bar and map charts (``india_geo`` may be None)."""
+    position = {int(code): i for i, code in enumerate(cube.state_codes)}
+    features = {"features": []} if india_geo is None else india_geo
+    return {
+        "version": cube.version,
+        "years": [int(y) for y in cube.years],
+        "states": list(cube.states),
+        "offender": _source_totals(cube, OFFENDER_CATEGORIES),
+        "cases": _source_totals(cube, [CASES_REPORTED]),
+        # Boundary features in feature order, each with the cube positions of the states it covers
+        "feature_names": state_names(features),
+        "features": [[position[int(c)] for c in codes if int(c) in position] for codes in feature_codes(features)],
+    }
+
+
+_payloads = {}
+_lock = threading.Lock()
+
+
+def payload_file(cube, india_geo, out_dir):
+    """Name of the served payload file for ``cube``'s data version, written on first use."""
+    name = _payloads.get(cube.version)
+    if name is None:
+        with _lock:
+            name = _payloads.get(cube.version)
+            if name is None:
+                text = json.dumps(explorer_payload(cube, india_geo), separators=(",", ":"))
+                name = f"explorer.{hashlib.sha1(text.encode()).hexdigest()[:10]}.json"
+                (out_dir / name).write_text(text, encoding="utf-8")
+                _payloads[cube.version] = name
+    return name
+
+
+# -------------------------
+# Component
+# -------------------------
+def trend_overlay(figure):
+    """The trend traces of a :func:`~dashboard.figures.yearly_trend_figure` (everything after the data line)."""
+    return json.loads(figure.to_json())["data"][1:]
+
+
+def explorer(cube, india_geo, filters, overlay=(), debounce_ms=DEBOUNCE_MS, key="explorer"):
+    """Draw the explorer; returns the last synced ``{"states", "year_range"}`` (None before the first sync).
+
+    ``filters`` is the selection the server rendered for; ``overlay`` holds extra
+    line-chart traces computed for it (see :func:`trend_overlay`). With
+    ``india_geo=None`` (boundaries not built) the map is left out.
+    """
+    component, files, out_dir = map_component.declare("india_explorer", "explorer.html")
+    # Same normalization as the component: no states, or all of them, is no state filter
+    states = list(filters.states) if filters.states and len(filters.states) < len(cube.states) else None
+    synced = {"states": states, "year_range": list(filters.year_range)}
+    return component(
+        data=payload_file(cube, india_geo, out_dir), synced=synced, overlay=list(overlay), debounce_ms=debounce_ms,
+        levels=files, zoom_levels=map_component.ZOOM_LEVELS, colorscale=map_component.COLORSCALE,
+        key=key, default=None)
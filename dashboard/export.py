@@ -0,0 +1,220 @@
+"""Chunked export of the filtered data and its aggregates (CSV, Parquet, Arrow IPC).
+
+Datasets:
+
+* ``assault`` – the filtered 1999-2013 rows (offender categories)
+* ``summary`` – the filtered 2015-2020 rows (reported cases)
+* ``yearly``  – combined total per year over both sources
+* ``states``  – combined total per state/UT over both sources
+
+:func:`iter_export` yields the encoded output chunk by chunk: the row filter is
+resolved to positions once (or, with the Parquet backend, pushed down into the
+dataset scan, see :mod:`dashboard.store`) and at most ``chunk_rows`` rows are
+materialized at a time, so large district-level extracts never exist as one
+in-memory string.
+Source rows come out in the same order on every backend: by year, then state
+code.
+``columns`` projects the output. From the shell::
+
+    python -m dashboard.export assault --format parquet --years 2005 2010 -o assault.parquet
+    python -m dashboard.export states --format csv --states "Madhya Pradesh" Bihar
+
+Over HTTP the same chunks are streamed by ``GET /export/<dataset>`` of
+:mod:`dashboard.api`. When ``DASHBOARD_API_URL`` points at that API (as the
+browser reaches it), the dashboard's download links there (:func:`export_url`)
+instead of building the file in the Streamlit process.
+"""
+
+import argparse
+import io
+import os
+import sys
+from urllib.parse import urlencode
+
+import numpy as np
+import pandas as pd
+
+from dashboard import shared, store
+from dashboard.data import ASSAULT, HAS_PARQUET, STATE_CODE, SUMMARY, load
+
+DATASETS = ("assault", "summary", "yearly", "states")
+
+# format -> (mime type, file extension)
+FORMATS = {"csv": ("text/csv", ".csv")}
+if HAS_PARQUET:
+    FORMATS.update({
+        "parquet": ("application/vnd.apache.parquet", ".parquet"),
+        "arrow": ("application/vnd.apache.arrow.stream", ".arrow"),
+    })
+
+CHUNK_ROWS = 65_536
+
+# Base URL of a running `python -m dashboard.api`, as the browser reaches it
+API_URL = os.environ.get("DASHBOARD_API_URL")
+
+_SOURCES = {"assault": ASSAULT, "summary": SUMMARY}
+
+
+# -------------------------
+# Row selection
+# -------------------------
+def _rows(name, states, year_range, cube):
+    """``(frame, positions)``: the rows of ``name`` that pass the filter, by position.
+
+    Source rows are ordered by (year, state code), the order of the dataset
+    scans (:func:`dashboard.store.scan`); rows sharing both keep their file order.
+    """
+    if name in _SOURCES:
+        source = _SOURCES[name]
+        frame = load(source)
+        year = frame[source.year_col].to_numpy()
+        mask = (year >= year_range[0]) & (year <= year_range[1])
+        if states is not None:
+            mask &= frame[source.state_col].isin(states).to_numpy()
+        positions = np.flatnonzero(mask)
+        return frame, positions[np.lexsort((frame[STATE_CODE].to_numpy()[positions], year[positions]))]
+
+    if cube is None:
+        from dashboard.cube import load_cube
+
+        cube = load_cube()
+    if name == "yearly":
+        frame = cube.yearly_totals(states, year_range).rename("Total_Cases").reset_index()
+    elif name == "states":
+        frame = cube.state_totals(states, year_range).rename("Total_Cases").reset_index()
+    else:
+        raise ValueError(f"Unknown dataset {name!r}; expected one of {DATASETS}")
+    return frame, np.arange(len(frame))
+
+
+def columns_of(name):
+    """Columns available for projection in dataset ``name``, in output order.
+
+    For the sources this is the schema order of the typed frames whatever the
+    backend (a Parquet dataset lists its partition column, the year, last).
+    """
+    if name in _SOURCES:
+        return list(_SOURCES[name].columns) + [STATE_CODE]
+    return ["Year", "Total_Cases"] if name == "yearly" else ["State/UT", "Total_Cases"]
+
+
+def _project(available, columns):
+    if columns is None:
+        return list(available)
+    unknown = [c for c in columns if c not in available]
+    if unknown:
+        raise ValueError(f"Unknown columns {unknown}; available: {list(available)}")
+    return list(columns)
+
+
+# -------------------------
+# Encoders
+# -------------------------
+class _Drain(io.RawIOBase):
+    """Write-only sink whose buffered bytes are handed out (and dropped) after each chunk."""
+
+    def __init__(self):
+        self._parts = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+
+def _chunks(frame, positions, columns, chunk_rows):
+    for start in range(0, len(positions), chunk_rows):
+        yield frame.iloc[positions[start:start + chunk_rows]][columns]
+
+
+def _iter_csv(chunks, columns):
+    header = True
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=header).encode("utf-8")
+        header = False
+    if header:  # no rows: still send the header line
+        yield pd.DataFrame(columns=columns).to_csv(index=False).encode("utf-8")
+
+
+def _iter_arrow(chunks, empty, fmt):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = _Drain()
+    schema = pa.Schema.from_pandas(empty, preserve_index=False)
+    writer = pq.ParquetWriter(sink, schema) if fmt == "parquet" else pa.ipc.new_stream(sink, schema)
+    try:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def iter_export(name, fmt="csv", states=None, year_range=(0, 9999), columns=None, chunk_rows=CHUNK_ROWS, cube=None):
+    """Yield dataset ``name`` encoded as ``fmt``, in chunks of at most ``chunk_rows`` rows."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {sorted(FORMATS)}")
+
+    if name in _SOURCES and (shared.ENABLED or store.BACKEND == "parquet"):
+        # Filters and projection pushed down into the dataset scan (or the published, memory-mapped rows)
+        columns = _project(columns_of(name), columns)
+        scan = shared.scan if shared.ENABLED else store.scan
+        empty, chunks = scan(_SOURCES[name], states, year_range, columns, chunk_rows)
+    else:
+        frame, positions = _rows(name, states, year_range, cube)
+        columns = _project(columns_of(name), columns)
+        empty, chunks = frame.iloc[:0][columns], _chunks(frame, positions, columns, chunk_rows)
+
+    if fmt == "csv":
+        return _iter_csv(chunks, columns)
+    return _iter_arrow(chunks, empty, fmt)
+
+
+def export_bytes(name, fmt="csv", **kwargs):
+    """The whole export as bytes (for ``st.download_button``, which needs it in memory)."""
+    return b"".join(iter_export(name, fmt, **kwargs))
+
+
+def export_url(name, fmt="csv", states=None, year_range=(0, 9999), columns=None, base=None):
+    """URL of the streamed export of :mod:`dashboard.api` for the same arguments as :func:`iter_export`."""
+    query = [("format", fmt), ("start", year_range[0]), ("end", year_range[1])]
+    query += [("state", state) for state in states or ()]
+    query += [("column", column) for column in columns or ()]
+    return f"{(base or API_URL).rstrip('/')}/export/{name}?{urlencode(query)}"
+
+
+def file_name(name, fmt):
+    return f"{name}{FORMATS[fmt][1]}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m dashboard.export", description=__doc__.splitlines()[0])
+    parser.add_argument("dataset", choices=DATASETS)
+    parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+    parser.add_argument("--states", nargs="+", default=None, help="canonical state/UT names (default: all)")
+    parser.add_argument("--years", nargs=2, type=int, default=(0, 9999), metavar=("START", "END"), help="inclusive year range")
+    parser.add_argument("--columns", nargs="+", default=None, help="columns to keep, in order (default: all)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    chunks = iter_export(args.dataset, args.format, args.states, tuple(args.years), args.columns, args.chunk_rows)
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        for chunk in chunks:
+            out.write(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
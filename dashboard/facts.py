@@ -0,0 +1,126 @@
+"""The long-format fact table both sources fold into.
+
+The 1999-2013 source is wide (five offender-category columns per row) and the
+2015-2020 source narrow (one ``Cases_Reported`` column). Once validated (see
+:func:`dashboard.data.validate_rows`), both become rows of one table with
+integer-coded columns::
+
+    source    state_code  year   category_code  count
+    int8      int8        int16  int8           int32
+
+``source`` is the position in ``SOURCES``, ``state_code`` the code from
+:mod:`dashboard.states` and ``category_code`` the position in ``CATEGORIES``
+(the offender categories, then ``Cases_Reported``). There is one fact per
+(state, year, category): repeated (state, year) rows, such as district-level
+data, are summed. The facts are ordered by that key.
+
+The aggregate cube is built from this table in one scatter (see
+:func:`dashboard.cube.build_cube`), whichever layout the rows came from: the
+typed frames, the Parquet backend's aggregates or the rows an ingest appended.
+
+::
+
+    python -m dashboard.facts validate        # check both CSVs against their schemas
+    python -m dashboard.facts write --out facts.parquet
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dashboard.data import ASSAULT, HAS_PARQUET, STATE_CODE, SUMMARY, SchemaError, load, read_source_csv, validate_rows
+from dashboard.states import MAX_CODE
+
+# source code -> source; categories are numbered across the sources in this order
+SOURCES = (ASSAULT, SUMMARY)
+CATEGORIES = tuple(col for source in SOURCES for col in source.count_cols)
+CASES_REPORTED = SUMMARY.count_cols[0]
+
+COLUMNS = {"source": "int8", "state_code": "int8", "year": "int16", "category_code": "int8", "count": "int32"}
+
+_SOURCE_OF_CATEGORY = np.array([i for i, source in enumerate(SOURCES) for _ in source.count_cols], dtype=np.int8)
+
+
+def fact_table(df, df1):
+    """Facts of the 1999-2013 rows ``df`` and the 2015-2020 rows ``df1`` (typed, or per-(state, year) sums)."""
+    frames = [(frame, source) for frame, source in ((df, ASSAULT), (df1, SUMMARY)) if len(frame)]
+    if not frames:
+        return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in COLUMNS.items()})
+
+    # One dense key per (state, year, category); each count column is summed into it by bincount
+    first_year = min(int(frame[source.year_col].min()) for frame, source in frames)
+    n_years = max(int(frame[source.year_col].max()) for frame, source in frames) - first_year + 1
+    n_categories = len(CATEGORIES)
+    size = (MAX_CODE + 1) * n_years * n_categories
+    sums, seen = np.zeros(size), np.zeros(size, dtype=bool)
+    for frame, source in frames:
+        base = (frame[STATE_CODE].to_numpy(dtype=np.int64) * n_years + frame[source.year_col].to_numpy(dtype=np.int64) - first_year) * n_categories
+        for col in source.count_cols:
+            key = base + CATEGORIES.index(col)
+            sums += np.bincount(key, weights=frame[col].to_numpy(), minlength=size)
+            seen[key] = True
+
+    key = np.flatnonzero(seen)  # in (state, year, category) order
+    category = key % n_categories
+    return pd.DataFrame({
+        "source": _SOURCE_OF_CATEGORY[category],
+        "state_code": (key // (n_categories * n_years)).astype(np.int8),
+        "year": ((key // n_categories) % n_years + first_year).astype(np.int16),
+        "category_code": category.astype(np.int8),
+        "count": sums[key].astype(np.int32),
+    })
+
+
+def load_facts():
+    """Facts of the currently loaded sources."""
+    return fact_table(load(ASSAULT), load(SUMMARY))
+
+
+# -------------------------
+# CLI
+# -------------------------
+def validate_sources(unique_keys=None):
+    """``{file name: [problems]}`` for both source CSVs; empty lists when they match their schemas."""
+    report = {}
+    for source in SOURCES:
+        try:
+            validate_rows(read_source_csv(source.path, source), source, unique_keys=unique_keys)
+        except SchemaError as exc:
+            report[source.file_name] = exc.problems
+        else:
+            report[source.file_name] = []
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m dashboard.facts", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    check = commands.add_parser("validate", help="check both source CSVs against their declared schemas")
+    check.add_argument("--allow-repeated-keys", action="store_true", help="accept several rows per (state/UT, year), e.g. district-level data (default: DASHBOARD_REPEATED_KEYS)")
+    write = commands.add_parser("write", help="write the fact table (Parquet, or CSV for a .csv path)")
+    write.add_argument("--out", type=Path, required=True)
+    args = parser.parse_args(argv)
+
+    if args.command == "validate":
+        failed = False
+        for name, problems in validate_sources(unique_keys=False if args.allow_repeated_keys else None).items():
+            print(f"{name}: {'ok' if not problems else f'{len(problems)} problem(s)'}")
+            for problem in problems:
+                print(f"  {problem}")
+            failed |= bool(problems)
+        return 1 if failed else 0
+
+    facts = load_facts()
+    if args.out.suffix == ".csv" or not HAS_PARQUET:
+        facts.to_csv(args.out.with_suffix(".csv"), index=False)
+    else:
+        facts.to_parquet(args.out, index=False)
+    print(f"wrote {len(facts):,} facts ({facts.memory_usage(index=False).sum():,} bytes in memory)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
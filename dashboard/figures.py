@@ -0,0 +1,178 @@
+"""Plotly figure builders for the dashboard charts.
+
+Each builder takes the aggregate cube plus exactly the filter inputs its chart
+depends on (see ``dashboard.sections.SECTION_INPUTS``) and returns a figure, or
+``None`` when there is nothing to plot. Nothing here touches Streamlit, so the
+same figures can be rendered outside the app.
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from dashboard import ranking, trends
+from dashboard.cube import CATEGORIES
+from dashboard.geo import feature_codes, state_names
+from dashboard.states import MAX_CODE
+
+_TREND_LABELS = {"linear": "Linear", "loglinear": "Log-linear"}
+_CATEGORY_COLORS = ['#fdae61', '#abd9e9', '#2c7bb6', '#d7191c', '#1a9641']
+
+
+# -------------------------
+# 1. Total Reported Cases Nationwide (1999-2020)
+# -------------------------
+def yearly_trend_figure(cube, states, year_range, trend=None, horizon=trends.HORIZON):
+    # Yearly totals over every category of both datasets (1999-2013 and 2015-2020)
+    combined_df = cube.yearly_totals(states, year_range, CATEGORIES).reset_index(name="Total Cases")
+
+    fig = px.line(combined_df, x="Year", y="Total Cases", markers=True, labels={"Total Cases": "Total Reported Cases", "Year": "Year"},)
+    fig.update_traces(line=dict(width=2, color='yellow'))
+    fig.update_layout(template='plotly_white')
+
+    if trend is not None:
+        _, fit = trends.selection_trend(cube, states, year_range, None, trend)
+        if fit.observed >= 2:
+            fig.update_traces(name="Total Reported Cases", showlegend=True)
+            span = np.arange(fit.first_year, fit.last_year + horizon + 1)
+            fig.add_trace(go.Scatter(x=span, y=fit.predict(span), mode='lines', name=f"{_TREND_LABELS[trend]} trend",
+                                     line=dict(width=2, color='orange', dash='dash')))
+            # Years inside the observed span without data (e.g. 2014, between the two sources)
+            gaps = np.setdiff1d(np.arange(fit.first_year, fit.last_year + 1), combined_df["Year"].to_numpy())
+            if len(gaps):
+                fig.add_trace(go.Scatter(x=gaps, y=fit.predict(gaps), mode='markers', name="Estimated (no data)",
+                                         marker=dict(size=10, color='orange', symbol='circle-open')))
+    return fig
+
+
+# -------------------------
+# 2. Yearly Trends by Offender Category (1999-2013)
+# -------------------------
+def category_trend_figure(cube, states, year_range, categories, trend=None, horizon=trends.HORIZON):
+    category_trends = cube.yearly_by_category(states, year_range, categories)
+
+    if category_trends.empty or category_trends.to_numpy().sum() == 0:  # Check if data is empty or all values are zero
+        return None
+
+    fig2 = go.Figure()
+    for column in category_trends.columns:
+        fig2.add_trace(go.Scatter(x=category_trends.index, y=category_trends[column], mode='lines', name=column, stackgroup='one', hoverinfo='x+y+name'))
+
+    if trend is not None:
+        # Stacked like the areas, so the top dashed line is the trend of the total
+        _, fit = trends.selection_trend(cube, states, year_range, list(category_trends.columns), trend)
+        fitted = fit.observed >= 2
+        if fitted.any():
+            span = np.arange(fit.first_year[fitted].min(), fit.last_year[fitted].max() + horizon + 1)
+            for i, (column, values) in enumerate(zip(category_trends.columns, fit.predict(span))):
+                fig2.add_trace(go.Scatter(x=span, y=np.nan_to_num(values), mode='lines', name=f"{column} ({_TREND_LABELS[trend].lower()} trend)",
+                                          stackgroup='trend', fill='none', hoverinfo='x+y+name',
+                                          line=dict(width=1.5, dash='dash', color=_CATEGORY_COLORS[i % len(_CATEGORY_COLORS)])))
+
+    fig2.update_layout(xaxis_title="Year", yaxis_title="Number of Cases", template='plotly_white', colorway=_CATEGORY_COLORS)
+    return fig2
+
+
+# -------------------------
+# 3. State-wise Comparison (Horizontal Bar Chart)
+# -------------------------
+def state_bars_figure(cube, states, year_range, n=10, metric="total", basis="combined"):
+    # One ranked state set (states tied with the n-th included), bars split by source where the metric adds up
+    top = ranking.ranking(cube, states, year_range, n, metric, basis)
+    if top.empty:
+        return None
+
+    value = ranking.METRICS[metric]
+    labels = [f"{rank}. {state}" for rank, state in zip(top["Rank"], top["State/UT"])]
+    sources = [source for source in ranking.SOURCES if source in top]
+
+    fig3 = go.Figure()
+    for source in sources:
+        fig3.add_trace(go.Bar(y=labels, x=top[source], name=source, orientation='h'))
+    if not sources:
+        fig3.add_trace(go.Bar(y=labels, x=top[value], name=value, orientation='h'))
+    fig3.update_layout(barmode='stack', xaxis_title=value, yaxis_title="State/UT", yaxis=dict(autorange="reversed"),
+                       height=max(450, 28 * len(top)))
+    return fig3
+
+
+# -------------------------
+# 4. Offender Category Breakdown (Pie Chart)
+# -------------------------
+def category_pie_figure(cube, states, year_range, categories):
+    if not categories:
+        return None
+    category_totals = cube.category_totals(states, year_range, categories)
+    if category_totals.sum() == 0:
+        return None
+
+    fig4 = px.pie(values=category_totals.values, names=category_totals.index, color_discrete_sequence=px.colors.qualitative.Pastel, hole=0.3)
+    fig4.update_traces(textinfo='percent+label', pull=[0.1] * len(category_totals), marker=dict(line=dict(color='#000000', width=2)))
+    return fig4
+
+
+# -------------------------
+# 5. Correlation Heatmap (1999-2013)
+# -------------------------
+def correlation_figure(cube, states, year_range, categories, method="pearson", by_state=False):
+    if not categories:
+        return None
+
+    # Needs at least two (state, year) cells of the 1999-2013 data in the selection
+    count = cube.moments(year_range, states, categories)[0]
+    if count.sum() < 2:
+        return None
+
+    if by_state:
+        return _state_correlation_figure(cube, states, year_range, categories, method, count)
+
+    # Compute correlation matrix
+    corr = pd.DataFrame(cube.correlation(states, year_range, categories, method=method), index=categories, columns=categories).round(2)
+
+    # Create 3D surface plot
+    fig_heat_3d = go.Figure(data=[go.Surface(z=corr.values, x=corr.columns, y=corr.index, colorscale='RdBu')])
+    fig_heat_3d.update_layout(width=900, height=700,
+                              scene=dict(xaxis_title="Offender Categories", yaxis_title="Offender Categories", zaxis_title="Correlation",),autosize=True,)
+    return fig_heat_3d
+
+
+def _state_correlation_figure(cube, states, year_range, categories, method, count):
+    # One row per state with at least two cells, one column per category pair
+    rows, cols = np.triu_indices(len(categories), k=1)
+    if not len(rows):
+        return None
+    pairs = [f"{categories[i]} / {categories[j]}" for i, j in zip(rows, cols)]
+    corr = cube.correlation(states, year_range, categories, method=method, by_state=True)
+    keep = count >= 2
+
+    z = pd.DataFrame(corr[keep][:, rows, cols], index=cube.states[cube.state_index(states)][keep], columns=pairs).round(2)
+    fig = go.Figure(data=[go.Heatmap(z=z.values, x=z.columns, y=z.index, colorscale='RdBu', zmin=-1, zmax=1, colorbar=dict(title="Correlation"))])
+    fig.update_layout(height=max(400, 22 * len(z)), xaxis_title="Offender Category Pair", yaxis_title="State/UT", margin={"t": 30})
+    return fig
+
+
+# -------------------------
+# 6. Geospatial Distribution of Total Sexual Assault Cases in India (1999-2020)
+# -------------------------
+def choropleth_values(cube, india_geo, states, year_range):
+    """Total cases per boundary feature, in feature order."""
+    # State totals over both datasets, scattered into a vector indexed by state code
+    totals_by_code = np.zeros(MAX_CODE + 1, dtype=np.int64)
+    np.add.at(totals_by_code, cube.state_codes[cube.state_index(states)], cube.range_totals(year_range, states).sum(axis=1))
+
+    # Join on the integer codes each feature covers (merged regions sum their members)
+    return [int(totals_by_code[codes].sum()) for codes in feature_codes(india_geo)]
+
+
+def choropleth_figure(cube, india_geo, states, year_range):
+    merged_data = pd.DataFrame({
+        "id": range(len(india_geo["features"])),
+        "ST_NM": state_names(india_geo),
+        "Total_Cases": choropleth_values(cube, india_geo, states, year_range),
+    })
+
+    fig5 = px.choropleth(merged_data, geojson=india_geo, locations='id', featureidkey="id", hover_name='ST_NM', hover_data={'id': False}, color='Total_Cases', color_continuous_scale="OrRd", scope="asia", labels={'Total_Cases': 'Reported Cases'})
+    fig5.update_geos(fitbounds="locations", visible=False)
+    fig5.update_layout(margin={"r": 0, "t": 30, "l": 0, "b": 0})
+    return fig5
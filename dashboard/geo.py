@@ -0,0 +1,233 @@
+"""Offline India state boundaries for the choropleth (section 6).
+
+The boundaries are preprocessed from the source GeoJSON vendored under
+``assets/geo/source/`` into a few simplified variants under ``assets/geo/`` with
+``ST_NM`` already upper-cased and stripped, so the dashboard never touches the
+network and matches state names without any per-rerun string work. The built
+variants are committed; rebuild them only after changing the source or
+``LEVELS``::
+
+    python -m dashboard.geo build                 # from the vendored source
+    python -m dashboard.geo build india.geojson   # or another GeoJSON path/URL
+
+At runtime :func:`load_boundaries` reads the requested variant lazily on first
+use and keeps it in a process-wide cache shared by every session. Serving never
+falls back to the network: until the assets are built it raises
+:class:`BoundariesNotBuilt`, and the callers check :func:`boundaries_built` to
+leave the map out instead. The runtime
+path is plain JSON – ``px.choropleth`` takes the FeatureCollection dict as is –
+so the geospatial stack (geopandas/shapely/pyproj) is only imported by the
+``build`` command and is not needed to serve the dashboard.
+
+On load every feature gets an integer ``id`` (its position) and the
+:mod:`dashboard.states` codes it covers, so the choropleth joins the data on
+integers rather than names.
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+from dashboard.states import region_codes
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------
+# Locations & Levels
+# -------------------------
+BUNDLED_DIR = Path(__file__).resolve().parent.parent / "assets" / "geo"
+ASSET_DIR = Path(os.environ.get("DASHBOARD_GEO_DIR", BUNDLED_DIR))
+
+# India map of echarts-countries-pypkg 0.1.6 (MIT), decoded to plain GeoJSON;
+# one feature covers Jammu & Kashmir and Ladakh, see MERGED_REGIONS
+GEO_SOURCE = BUNDLED_DIR / "source" / "india_states.geojson"
+
+# Simplification tolerance in degrees (~1 km per 0.01) for each bundled level
+LEVELS = {"full": 0.0, "medium": 0.01, "low": 0.05}
+DEFAULT_LEVEL = "medium"
+
+# Coordinates are rounded to this many decimals (~10 m) when the assets are written
+COORD_PRECISION = 4
+
+# TopoJSON grid size per level for the compact map (see to_topojson)
+QUANTIZATION = {"full": 1_000_000, "medium": 100_000, "low": 10_000}
+
+
+class BoundariesNotBuilt(FileNotFoundError):
+    """The boundary assets under ``ASSET_DIR`` have not been built."""
+
+
+def asset_path(level):
+    return ASSET_DIR / f"india_states_{level}.geojson"
+
+
+def boundaries_built():
+    """Whether the asset of every level in ``LEVELS`` exists (one ``stat`` per level)."""
+    return all(asset_path(level).exists() for level in LEVELS)
+
+
+def normalize_name(name):
+    return name.upper().strip()
+
+
+# -------------------------
+# One-shot Preprocessing
+# -------------------------
+def build_boundaries(source=GEO_SOURCE, out_dir=None):
+    """Write one simplified, name-normalized GeoJSON per entry in ``LEVELS``."""
+    import geopandas as gpd  # optional: only needed to preprocess the assets
+
+    out_dir = Path(out_dir) if out_dir else ASSET_DIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    geo = gpd.read_file(source)[["ST_NM", "geometry"]]
+    geo["ST_NM"] = geo["ST_NM"].map(normalize_name)
+    geo["geometry"] = geo.geometry.make_valid()
+    geo = geo.dissolve(by="ST_NM", as_index=False)
+
+    written = []
+    for level, tolerance in LEVELS.items():
+        simplified = geo.copy()
+        if tolerance:
+            simplified["geometry"] = simplified.geometry.simplify(tolerance, preserve_topology=True)
+        path = out_dir / f"india_states_{level}.geojson"
+        simplified.to_file(path, driver="GeoJSON", COORDINATE_PRECISION=COORD_PRECISION)
+        written.append(path)
+    return written
+
+
+# -------------------------
+# Runtime Loading
+# -------------------------
+_cache = {}
+_lock = threading.Lock()
+
+
+def _read(level):
+    path = asset_path(level)
+    if not path.exists():
+        raise BoundariesNotBuilt(
+            f"Boundary asset {path} is missing; rebuild the assets with `python -m dashboard.geo build`")
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _annotate(geo):
+    """Give each feature an integer ``id`` and the state codes it covers."""
+    unmatched = []
+    for i, feature in enumerate(geo["features"]):
+        codes = region_codes(feature["properties"]["ST_NM"])
+        if not codes:
+            unmatched.append(feature["properties"]["ST_NM"])
+        feature["id"] = i
+        feature["properties"]["state_codes"] = list(codes)
+    if unmatched:
+        logger.warning("Boundary features with no state code (drawn empty): %s", unmatched)
+    return geo
+
+
+def state_names(geo):
+    """``ST_NM`` of every feature, in feature order."""
+    return [feature["properties"]["ST_NM"] for feature in geo["features"]]
+
+
+def feature_codes(geo):
+    """State codes covered by every feature, in feature order (several for merged regions)."""
+    return [feature["properties"]["state_codes"] for feature in geo["features"]]
+
+
+def load_boundaries(level=DEFAULT_LEVEL):
+    """GeoJSON FeatureCollection (dict) of state boundaries at ``level`` (read once per process, read-only).
+
+    Raises :class:`BoundariesNotBuilt` when the asset is missing; nothing is
+    cached then, so assets built later are picked up on the next call.
+    """
+    if level not in LEVELS:
+        raise ValueError(f"Unknown boundary level {level!r}; expected one of {sorted(LEVELS)}")
+
+    geo = _cache.get(level)
+    if geo is None:
+        with _lock:
+            geo = _cache.get(level)
+            if geo is None:
+                geo = _cache[level] = _annotate(_read(level))
+    return geo
+
+
+# -------------------------
+# Compact Encoding
+# -------------------------
+def _rings(geometry):
+    if geometry is None:
+        return None, []
+    if geometry["type"] == "Polygon":
+        return "Polygon", [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return "MultiPolygon", geometry["coordinates"]
+    raise ValueError(f"Unsupported geometry type {geometry['type']!r}")
+
+
+def to_topojson(geo, quantization=QUANTIZATION[DEFAULT_LEVEL]):
+    """Quantized, delta-encoded TopoJSON of an annotated FeatureCollection.
+
+    One object, ``states``, with one geometry per feature carrying the
+    feature's integer ``id`` and ``ST_NM``. Each ring is its own arc (borders
+    are not shared), which keeps the encoder small; quantization and delta
+    encoding are where the size goes.
+    """
+    points = [pt for f in geo["features"] for poly in _rings(f["geometry"])[1] for ring in poly for pt in ring]
+    x0, y0 = min(p[0] for p in points), min(p[1] for p in points)
+    x1, y1 = max(p[0] for p in points), max(p[1] for p in points)
+    kx = (x1 - x0) / (quantization - 1) or 1.0
+    ky = (y1 - y0) / (quantization - 1) or 1.0
+
+    arcs = []
+
+    def encode_ring(ring):
+        quantized = [(round((x - x0) / kx), round((y - y0) / ky)) for x, y, *_ in ring]
+        deduped = [pt for i, pt in enumerate(quantized) if i == 0 or pt != quantized[i - 1]]
+        if len(deduped) >= 4:
+            quantized = deduped
+        arc, px, py = [], 0, 0
+        for x, y in quantized:
+            arc.append([x - px, y - py])
+            px, py = x, y
+        arcs.append(arc)
+        return [len(arcs) - 1]
+
+    geometries = []
+    for feature in geo["features"]:
+        kind, polygons = _rings(feature["geometry"])
+        encoded = {"type": kind, "id": feature["id"], "properties": {"ST_NM": feature["properties"]["ST_NM"]}}
+        if kind == "Polygon":
+            encoded["arcs"] = [encode_ring(ring) for ring in polygons[0]]
+        elif kind == "MultiPolygon":
+            encoded["arcs"] = [[encode_ring(ring) for ring in polygon] for polygon in polygons]
+        geometries.append(encoded)
+
+    return {
+        "type": "Topology",
+        "transform": {"scale": [kx, ky], "translate": [x0, y0]},
+        "objects": {"states": {"type": "GeometryCollection", "geometries": geometries}},
+        "arcs": arcs,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m dashboard.geo", description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="preprocess the boundary assets")
+    build.add_argument("source", nargs="?", default=GEO_SOURCE, help=f"GeoJSON path or URL (default: {GEO_SOURCE})")
+    build.add_argument("--out-dir", default=None, help=f"output directory (default: {ASSET_DIR})")
+    args = parser.parse_args(argv)
+
+    for path in build_boundaries(args.source, args.out_dir):
+        print(f"wrote {path} ({path.stat().st_size / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
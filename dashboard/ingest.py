@@ -0,0 +1,153 @@
+"""Append a new reporting year to one of the sources, without a rebuild or restart.
+
+::
+
+    python -m dashboard.ingest "Summary of cases (rape) 2021.csv"
+    python -m dashboard.ingest assault-2014.csv --source assault
+    python -m dashboard.ingest s2021.csv --shared-dir /dev/shm/ncrb   # republish for the workers there
+
+The file is validated against the source's declared schema (see
+:func:`dashboard.data.validate_rows`) before anything is written:
+
+* the same columns (in any order; they are written back in the source's order)
+* values that parse as the source's types, with no missing or negative counts
+* only state/UT names known to :mod:`dashboard.states`
+* one row per (state/UT, year), unless ``DASHBOARD_REPEATED_KEYS`` declares
+  district-level data
+* only years the source does not already have
+
+The rows are then appended to the source CSV (written next to it and swapped
+in, so readers see the old file or the new one). Before the swap, the typed
+rows are stored as a delta snapshot and the whole new frame as the snapshot
+for the new contents (see :mod:`dashboard.data`); with a Parquet dataset
+(:mod:`dashboard.store`) the rows are added as new partition files and listed
+in the manifest. Running dashboard and API processes notice the change on
+their next file stat, read only the delta and extend their cube in place of
+a full rebuild.
+
+Workers attached to a published directory (``DASHBOARD_SHARED_DIR``, see
+:mod:`dashboard.shared`) only see the new rows once it is republished. Pass
+each such directory with ``--shared-dir``; without it, the directory this
+process would publish to is republished if it holds a snapshot, and otherwise
+a warning says that no workers were updated.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from dashboard import shared, store
+from dashboard.data import HAS_PARQUET, SchemaError, content_hash, delta_path, extend_frame, load, read_source_csv, snapshot_path, validate_rows, write_snapshot
+from dashboard.store import SOURCES
+
+
+class IngestError(ValueError):
+    pass
+
+
+# -------------------------
+# Validation
+# -------------------------
+def detect_source(path):
+    """Name of the source whose columns match the header of ``path``."""
+    header = set(pd.read_csv(path, nrows=0).columns)
+    for name, source in SOURCES.items():
+        if header == set(source.columns):
+            return name
+    raise IngestError(f"{path}: columns {sorted(header)} match no source; pass --source")
+
+
+def validate(path, source, existing):
+    """``(raw rows in the source's column order, typed rows)`` for the file at ``path``."""
+    try:
+        raw = read_source_csv(path, source)
+        if raw.empty:
+            raise SchemaError(["no rows"])
+        typed = validate_rows(raw, source)
+    except SchemaError as exc:
+        raise IngestError(f"{path}: {exc}") from None
+
+    years = set(raw[source.year_col].unique().tolist())
+    clash = sorted(years & set(existing[source.year_col].unique().tolist()))
+    if clash:
+        raise IngestError(f"{path}: {source.file_name} already has {clash}")
+    return raw, typed
+
+
+# -------------------------
+# Append
+# -------------------------
+def ingest(path, name, shared_dirs=None):
+    """Append the file at ``path`` to source ``name``; returns ``(rows added, republished directories)``.
+
+    ``shared_dirs`` are the published directories to republish (default: this
+    process's :func:`dashboard.shared.publish_dir`, if it has been published).
+    """
+    source = SOURCES[name]
+    existing = load(source)
+    raw, typed = validate(path, source, existing)
+
+    added = raw.to_csv(index=False, header=False).encode("utf-8")
+    with open(source.path, "rb") as fh:
+        fh.seek(-1, os.SEEK_END)
+        if fh.read(1) != b"\n":  # the last row has no line break of its own
+            added = b"\n" + added
+
+    # Snapshots first: by the time a running process sees the new CSV, its delta is there
+    if HAS_PARQUET:
+        old_hash = content_hash(source.path)
+        new_hash = content_hash(source.path, added)
+        write_snapshot(typed, delta_path(source, old_hash, new_hash))
+        write_snapshot(extend_frame(source, existing, typed), snapshot_path(source, new_hash))
+
+    tmp = source.path.with_name(f".{source.file_name}.{os.getpid()}.tmp")
+    shutil.copyfile(source.path, tmp)
+    with open(tmp, "ab") as fh:
+        fh.write(added)
+    os.replace(tmp, source.path)
+
+    if HAS_PARQUET and (store.DATASET_DIR / store.MANIFEST).exists():
+        store.append({name: typed})
+    return len(typed), republish(shared_dirs)
+
+
+def republish(shared_dirs=None):
+    """Publish the new data into ``shared_dirs`` (or the default one, if published); returns the directories."""
+    if shared_dirs is None:
+        shared_dirs = [shared.publish_dir()] if shared.current_version() is not None else []
+    if shared_dirs and not HAS_PARQUET:
+        raise IngestError("republishing the shared dataset needs pyarrow")
+    for out_dir in shared_dirs:
+        shared.publish(out_dir)
+    return [shared.publish_dir(out_dir) for out_dir in shared_dirs]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m dashboard.ingest", description=__doc__.splitlines()[0])
+    parser.add_argument("file", type=Path, help="CSV with the new year(s), in the source's column layout")
+    parser.add_argument("--source", choices=sorted(SOURCES), default=None, help="source to append to (default: detected from the header)")
+    parser.add_argument("--shared-dir", dest="shared_dirs", action="append", type=Path, default=None, metavar="DIR",
+                        help="published directory to republish for the workers attached to it (repeatable)")
+    args = parser.parse_args(argv)
+
+    try:
+        name = args.source or detect_source(args.file)
+        rows, republished = ingest(args.file, name, args.shared_dirs)
+    except IngestError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    print(f"appended {rows:,} rows to {SOURCES[name].file_name}")
+    for out_dir in republished:
+        print(f"republished {out_dir}")
+    if not republished:
+        print(f"warning: no published snapshot at {shared.publish_dir()}; workers attached with DASHBOARD_SHARED_DIR "
+              "keep serving the old data until it is republished (pass --shared-dir DIR)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
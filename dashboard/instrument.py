@@ -0,0 +1,171 @@
+"""Per-section timing/size instrumentation for dashboard reruns.
+
+Enabled with ``DASHBOARD_INSTRUMENT=1``. Each named section records its wall
+time, the number of data rows it read and the size of the payload it produced.
+Records are
+
+* emitted as one JSON log line each on the ``dashboard.instrument`` logger, and
+* kept for the current rerun so :func:`render_debug_panel` can show them in the
+  sidebar.
+
+Sections drawn in a fragment declared with :func:`fragment` are also rerun on
+their own. Such a rerun gets a fresh record set and run id (its log lines carry
+the fragment's name), and since the sidebar panel is not redrawn then, its
+timings are shown inside the fragment instead.
+
+When disabled, :func:`section` hands back one shared no-op record: no clock
+reads, no session-state access, nothing logged.
+"""
+
+import functools
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+
+ENABLED = os.environ.get("DASHBOARD_INSTRUMENT", "").lower() in ("1", "true", "yes")
+
+logger = logging.getLogger(__name__)
+
+_RUN_KEY = "_instrument_records"
+_RUN_ID_KEY = "_instrument_run"
+_FRAGMENT_KEY = "_instrument_fragment"  # name of the fragment rerunning on its own; None during a full run
+_FULL_RUN_KEY = "_instrument_full_run"  # True from start_run until render_debug_panel
+_run_ids = itertools.count(1)
+
+
+class _NullRecord:
+    """Stand-in used while instrumentation is off; falsy so callers can skip extra work."""
+
+    def __bool__(self):
+        return False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def update(self, **fields):
+        pass
+
+
+_NULL = _NullRecord()
+
+
+class SectionRecord:
+    def __init__(self, name, records, run):
+        self.fields = {"run": run, "section": name}
+        self._records = records
+
+    def __bool__(self):
+        return True
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.fields["seconds"] = round(time.perf_counter() - self._start, 6)
+        if exc_type is not None:
+            self.fields["error"] = exc_type.__name__
+        self.fields["ts"] = time.time()
+        self._records.append(self.fields)
+        logger.info(json.dumps(self.fields, default=str))
+        return False
+
+    def update(self, **fields):
+        self.fields.update(fields)
+
+
+def _run_records():
+    import streamlit as st
+
+    return st.session_state.setdefault(_RUN_KEY, [])
+
+
+def _new_run(fragment_name=None):
+    import streamlit as st
+
+    st.session_state[_RUN_KEY] = []
+    st.session_state[_RUN_ID_KEY] = next(_run_ids)
+    st.session_state[_FRAGMENT_KEY] = fragment_name
+
+
+def start_run():
+    """Begin a new full rerun: drop the previous run's records."""
+    if ENABLED:
+        import streamlit as st
+
+        _new_run()
+        st.session_state[_FULL_RUN_KEY] = True
+
+
+def fragment(func):
+    """``st.fragment`` whose reruns on its own record (and show) their own section timings."""
+    import streamlit as st
+
+    if not ENABLED:
+        return st.fragment(func)
+
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        if st.session_state.get(_FULL_RUN_KEY, True):
+            return func(*args, **kwargs)  # part of a full run: recorded with it, shown in the sidebar
+        _new_run(func.__name__)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with st.expander(f"🛠 Debug: {func.__name__} rerun", expanded=False):
+                _records_table(_run_records())
+
+    return st.fragment(run)
+
+
+def section(name, **fields):
+    """Context manager timing section ``name``; ``record.update(rows=..., payload_bytes=...)`` adds fields."""
+    if not ENABLED:
+        return _NULL
+    import streamlit as st
+
+    record = SectionRecord(name, _run_records(), st.session_state.get(_RUN_ID_KEY))
+    if st.session_state.get(_FRAGMENT_KEY):
+        record.update(fragment=st.session_state[_FRAGMENT_KEY])
+    record.update(**fields)
+    return record
+
+
+def _records_table(records):
+    import streamlit as st
+
+    if records:
+        st.dataframe([{k: v for k, v in r.items() if k not in ("run", "ts", "fragment")} for r in records], hide_index=True)
+        st.caption(f"Total: {sum(r['seconds'] for r in records) * 1000:.1f} ms across {len(records)} sections")
+
+
+def render_debug_panel():
+    """Sidebar table of this full rerun's section records plus the shared cache counters.
+
+    Call it last: fragment reruns after it record on their own (see :func:`fragment`).
+    """
+    if not ENABLED:
+        return
+    import streamlit as st
+
+    from dashboard.cache import result_cache
+
+    with st.sidebar.expander("🛠 Debug: section timings", expanded=False):
+        _records_table(_run_records())
+        st.json(result_cache.stats())
+    st.session_state[_FULL_RUN_KEY] = False
+
+
+if ENABLED and not logger.handlers:
+    # One bare JSON object per line, ready for a log shipper
+    _handler = logging.StreamHandler(sys.stderr)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
@@ -0,0 +1,48 @@
+"""Key Performance Indicators computed from the aggregate cube."""
+
+from dashboard.cube import CATEGORIES
+
+
+def compute_kpis(cube, states, year_range):
+    """KPI values for the selected states/UTs and inclusive ``year_range`` (all case categories)."""
+    n_years = year_range[1] - year_range[0] + 1
+    total_cases = cube.total(states, year_range, CATEGORIES)
+
+    # Highest/lowest year over the years that actually have rows
+    yearly = cube.yearly_totals(states, year_range, CATEGORIES)
+    if yearly.empty:
+        highest_case_year = lowest_case_year = 'No data'
+    else:
+        highest_case_year = int(yearly.idxmax())
+        lowest_case_year = int(yearly.idxmin())
+
+    # State with highest average cases
+    state_totals = cube.state_totals(states, year_range, CATEGORIES)
+    if state_totals.empty:
+        highest_avg_state, highest_avg_state_cases = 'No data', 0
+    else:
+        state_avg_cases = state_totals / n_years
+        highest_avg_state = state_avg_cases.idxmax()
+        highest_avg_state_cases = int(state_avg_cases.max())
+
+    return {
+        "total_cases": total_cases,
+        "average_cases_per_state": total_cases / len(states) if states else 0,
+        "cases_per_year": total_cases / n_years,
+        "highest_case_year": highest_case_year,
+        "lowest_case_year": lowest_case_year,
+        "highest_avg_state": highest_avg_state,
+        "highest_avg_state_cases": highest_avg_state_cases,
+    }
+
+
+def yearly_series(cube, states, year_range):
+    """``[{"year", "total_cases"}]`` for the years with rows in the selection (all case categories)."""
+    yearly = cube.yearly_totals(states, year_range, CATEGORIES)
+    return [{"year": int(year), "total_cases": int(total)} for year, total in yearly.items()]
+
+
+def state_series(cube, states, year_range):
+    """``[{"state", "total_cases"}]`` for the states/UTs with rows in the selection (all case categories)."""
+    totals = cube.state_totals(states, year_range, CATEGORIES)
+    return [{"state": state, "total_cases": int(total)} for state, total in totals.items()]
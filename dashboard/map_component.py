@@ -0,0 +1,97 @@
+"""Compact choropleth: geometry shipped once per session, values-only reruns.
+
+``px.choropleth`` embeds the full boundary GeoJSON in the figure JSON, so every
+rerun of section 6 resends the geometry for a few dozen numbers. With
+``DASHBOARD_MAP_MODE=compact`` the map is drawn by a small Streamlit component
+(``map_frontend/index.html``, drawing through ``map_frontend/choropleth.js``)
+instead:
+
+* the boundaries of every level in ``geo.LEVELS`` are encoded once per process
+  as quantized TopoJSON (:func:`dashboard.geo.to_topojson`) and served as static
+  files next to the component, so the browser downloads them once and caches
+  them;
+* each rerun sends only the per-feature values (aligned with the feature ids
+  from :func:`dashboard.geo.load_boundaries`), applied client-side with
+  ``Plotly.restyle``;
+* the detail level follows the map's zoom (``ZOOM_LEVELS``), fetched on demand.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+from plotly.colors import sequential
+
+from dashboard.geo import LEVELS, QUANTIZATION, boundaries_built, load_boundaries, to_topojson
+
+COMPACT = os.environ.get("DASHBOARD_MAP_MODE", "plotly").lower() == "compact"
+
+FRONTEND_DIR = Path(__file__).resolve().parent / "map_frontend"
+
+# (minimum geo projection scale, level): coarsest geometry for the whole country
+ZOOM_LEVELS = ((0, "low"), (2.5, "medium"), (10, "full"))
+
+COLORSCALE = [[i / (len(sequential.OrRd) - 1), color] for i, color in enumerate(sequential.OrRd)]
+
+
+# -------------------------
+# Served Files (once per process and page)
+# -------------------------
+_components = {}
+_lock = threading.Lock()
+
+
+def _link_or_copy(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def _publish(page):
+    """Write ``page`` (as index.html), its scripts and one content-addressed TopoJSON per level into a served directory.
+
+    No TopoJSON is written while the boundary assets are not built (``files`` is empty then).
+    """
+    import plotly
+
+    out_dir = Path(tempfile.mkdtemp(prefix="dashboard-map-"))
+    atexit.register(shutil.rmtree, out_dir, ignore_errors=True)
+
+    shutil.copyfile(FRONTEND_DIR / page, out_dir / "index.html")
+    shutil.copyfile(FRONTEND_DIR / "choropleth.js", out_dir / "choropleth.js")
+    _link_or_copy(Path(plotly.__file__).parent / "package_data" / "plotly.min.js", out_dir / "plotly.min.js")
+
+    files = {}
+    for level in LEVELS if boundaries_built() else ():
+        text = json.dumps(to_topojson(load_boundaries(level), QUANTIZATION[level]), separators=(",", ":"))
+        name = f"india_states_{level}.{hashlib.sha1(text.encode()).hexdigest()[:10]}.topojson"
+        (out_dir / name).write_text(text, encoding="utf-8")
+        files[level] = name
+    return out_dir, files
+
+
+def declare(name, page="index.html"):
+    """``(component, TopoJSON file per level, served directory)`` for ``page`` of map_frontend, declared once."""
+    declared = _components.get(name)
+    if declared is None:
+        with _lock:
+            declared = _components.get(name)
+            if declared is None:
+                import streamlit.components.v1 as components
+
+                out_dir, files = _publish(page)
+                declared = _components[name] = (components.declare_component(name, path=str(out_dir)), files, out_dir)
+    return declared
+
+
+def choropleth_map(values, label="Reported Cases", height=450, key="choropleth_map"):
+    """Draw the compact choropleth; ``values`` holds one number per boundary feature, in feature order."""
+    component, files, _ = declare("india_choropleth")
+    component(values=list(values), levels=files, zoom_levels=ZOOM_LEVELS, colorscale=COLORSCALE,
+              label=label, height=height, key=key, default=None)
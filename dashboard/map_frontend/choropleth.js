@@ -0,0 +1,104 @@
+// Choropleth drawing shared by the map and explorer components
+// (see dashboard/map_component.py): TopoJSON decoding, per-level geometry
+// loading and a Plotly choropleth whose detail level follows the zoom.
+"use strict";
+
+// -------------------------
+// TopoJSON decoding (delta-encoded arcs, one transform)
+// -------------------------
+function decodeTopology(topology) {
+  const [kx, ky] = topology.transform.scale;
+  const [tx, ty] = topology.transform.translate;
+  const arcs = topology.arcs.map(function (arc) {
+    let x = 0, y = 0;
+    return arc.map(function (d) { x += d[0]; y += d[1]; return [x * kx + tx, y * ky + ty]; });
+  });
+  function ring(indexes) {
+    const coords = [];
+    indexes.forEach(function (i, n) {
+      const arc = i >= 0 ? arcs[i] : arcs[~i].slice().reverse();
+      (n ? arc.slice(1) : arc).forEach(function (pt) { coords.push(pt); });
+    });
+    return coords;
+  }
+  const features = topology.objects.states.geometries.map(function (g) {
+    let geometry = null;
+    if (g.type === "Polygon") geometry = {type: "Polygon", coordinates: g.arcs.map(ring)};
+    if (g.type === "MultiPolygon") geometry = {type: "MultiPolygon", coordinates: g.arcs.map(function (p) { return p.map(ring); })};
+    return {type: "Feature", id: g.id, properties: g.properties, geometry: geometry};
+  });
+  return {type: "FeatureCollection", features: features};
+}
+
+// -------------------------
+// Choropleth
+// -------------------------
+// opts: {levels: {level: file}, zoom_levels: [[scale, level]], colorscale, label, height, textColor}
+function Choropleth(element, opts) {
+  this.element = element;
+  this.opts = opts;
+  this.geometries = {};   // level -> Promise of GeoJSON FeatureCollection
+  this.level = null;
+  this.drawn = null;      // Promise resolved once the first plot is on screen
+}
+
+Choropleth.prototype.load = function (name) {
+  if (!this.geometries[name]) {
+    this.geometries[name] = fetch(this.opts.levels[name]).then(function (r) { return r.json(); }).then(decodeTopology);
+  }
+  return this.geometries[name];
+};
+
+// Coarsest level whose zoom threshold has been reached
+Choropleth.prototype.levelFor = function (scale) {
+  let chosen = this.opts.zoom_levels[0][1];
+  this.opts.zoom_levels.forEach(function (entry) { if (scale >= entry[0]) chosen = entry[1]; });
+  return chosen;
+};
+
+Choropleth.prototype.draw = function (geo, values) {
+  const self = this, opts = this.opts;
+  const trace = {
+    type: "choropleth",
+    geojson: geo,
+    featureidkey: "id",
+    locations: geo.features.map(function (f) { return f.id; }),
+    text: geo.features.map(function (f) { return f.properties.ST_NM; }),
+    z: values,
+    colorscale: opts.colorscale,
+    colorbar: {title: {text: opts.label}},
+    hovertemplate: "<b>%{text}</b><br>" + opts.label + ": %{z:,}<extra></extra>",
+    marker: {line: {width: 0.5}},
+  };
+  const layout = {
+    height: opts.height,
+    margin: {r: 0, t: 30, l: 0, b: 0},
+    paper_bgcolor: "rgba(0,0,0,0)",
+    font: {color: opts.textColor},
+    geo: {fitbounds: "locations", visible: false, bgcolor: "rgba(0,0,0,0)"},
+  };
+  return Plotly.newPlot(this.element, [trace], layout, {responsive: true, displaylogo: false}).then(function (gd) {
+    gd.on("plotly_relayout", function (update) {
+      const scale = update["geo.projection.scale"];
+      if (scale === undefined) return;
+      const wanted = self.levelFor(scale);
+      if (wanted === self.level) return;
+      self.level = wanted;
+      self.load(wanted).then(function (finer) {
+        if (self.level === wanted) Plotly.restyle(gd, {geojson: [finer]});
+      });
+    });
+  });
+};
+
+// Draw on the first call; afterwards only the values change
+Choropleth.prototype.update = function (values) {
+  const self = this;
+  if (!this.drawn) {
+    this.level = this.levelFor(1);
+    this.drawn = this.load(this.level).then(function (geo) { return self.draw(geo, values); });
+  } else {
+    this.drawn.then(function () { Plotly.restyle(self.element, {z: [values]}); });
+  }
+  return this.drawn;
+};
@@ -0,0 +1,148 @@
+"""Top-N state/UT rankings over prefix-summed state totals.
+
+A ranking scores every selected state/UT on one metric over the filter's year
+range and keeps the best ``n``:
+
+* ``total``    – cases reported
+* ``per_year`` – cases per year with data
+* ``growth``   – least-squares slope of the yearly cases over the years with
+  data, relative to their mean (% per year)
+* ``per_100k`` – cases per year per 100,000 population (:mod:`dashboard.census`)
+
+Scores are taken over a basis: both sources combined (one state set for
+1999-2020), or either source alone. Per basis and data version, the yearly
+series ``y`` of every state is reduced to prefix sums along the year axis of
+``w``, ``w·t``, ``w·t²``, ``w·y``, ``w·t·y`` and ``w·population`` (``w`` marks
+years with a row, ``t`` is the centred year). Every metric for any year range
+is then two lookups per state, and the ``n`` best come from
+``np.argpartition`` instead of a full sort. States tied with the ``n``-th are
+all kept and share a rank ("1, 2, 2, 4").
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from dashboard import census
+from dashboard.cube import CASES_REPORTED, CATEGORIES, OFFENDER_CATEGORIES
+
+METRICS = {
+    "total": "Total Cases Reported",
+    "per_year": "Cases per Year",
+    "growth": "Growth per Year (%)",
+    "per_100k": f"Cases per 100k Population per Year (Census {census.CENSUS_YEAR})",
+}
+
+# basis -> categories it sums; the per-source bases name the years they cover
+SOURCES = {"1999-2013": tuple(OFFENDER_CATEGORIES), "2015-2020": (CASES_REPORTED,)}
+BASES = {"combined": CATEGORIES, **SOURCES}
+
+# Metrics that are a sum over the sources, so their bars can be split by source
+ADDITIVE = ("total", "per_year", "per_100k")
+
+# Index of the prefix stack (see _moments)
+_W, _WT, _WTT, _WY, _WTY, _WPOP = range(6)
+
+
+# -------------------------
+# Selection
+# -------------------------
+def top_n(values, n):
+    """``(indices, ranks)`` of the ``n`` largest finite ``values``, plus any tied with the ``n``-th.
+
+    Ordered by value (descending), ties by position; ranks are competition ranks.
+    """
+    candidates = np.flatnonzero(np.isfinite(values))
+    if 0 < n < len(candidates):
+        # The n-th largest value, without sorting the rest
+        kth = values[candidates[np.argpartition(-values[candidates], n - 1)[n - 1]]]
+        candidates = candidates[values[candidates] >= kth]
+    elif n <= 0:
+        candidates = candidates[:0]
+
+    order = candidates[np.lexsort((candidates, -values[candidates]))]
+    ordered = -values[order]
+    ranks = np.searchsorted(ordered, ordered, side="left") + 1
+    return order, ranks
+
+
+# -------------------------
+# Prefix index (once per data version)
+# -------------------------
+_cache = {}
+_lock = threading.Lock()
+
+
+def _moments(cube, basis):
+    """(6 × states × years+1) prefix sums of the weighted regression moments and population."""
+    c_idx = cube.category_index(BASES[basis])
+    y = np.asarray(cube.values)[:, :, c_idx].sum(axis=2).astype(np.float64)
+    w = np.asarray(cube.present)[:, :, c_idx].any(axis=2).astype(np.float64)
+    t = (cube.years - cube.years.mean()).astype(np.float64)
+    pop = census.population(cube.state_codes, cube.years, cube.undivided)
+
+    terms = np.stack([w, w * t, w * t * t, w * y, w * t * y, w * pop])
+    return np.pad(terms.cumsum(axis=2), ((0, 0), (0, 0), (1, 0)))
+
+
+def _index(cube, basis):
+    key = (basis, cube.undivided)
+    cached = _cache.get(key)
+    if cached is None or cached[0] != cube.version:
+        with _lock:
+            cached = _cache.get(key)
+            if cached is None or cached[0] != cube.version:
+                cached = _cache[key] = (cube.version, _moments(cube, basis))
+    return cached[1]
+
+
+def _window(cube, basis, s_idx, year_range):
+    """Moment sums over ``year_range`` for the states ``s_idx``: shape (6 × states)."""
+    y_sl = cube.year_slice(year_range)
+    prefix = _index(cube, basis)
+    return prefix[:, s_idx, y_sl.stop] - prefix[:, s_idx, y_sl.start]
+
+
+def metric_values(cube, states, year_range, metric="total", basis="combined"):
+    """``(state positions, scores)`` for the selected states; NaN where a state has no score."""
+    if metric not in METRICS:
+        raise ValueError(f"Unknown ranking metric {metric!r}; expected one of {tuple(METRICS)}")
+    if basis not in BASES:
+        raise ValueError(f"Unknown ranking basis {basis!r}; expected one of {tuple(BASES)}")
+    s_idx = cube.state_index(states)
+    m = _window(cube, basis, s_idx, year_range)
+    n, total = m[_W], m[_WY]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if metric == "total":
+            scores = total.copy()
+        elif metric == "per_year":
+            scores = total / n
+        elif metric == "per_100k":
+            scores = total / m[_WPOP] * 1e5
+        else:
+            # Slope of y = a + b·t over the years with data, relative to the mean level
+            var = n * m[_WTT] - m[_WT] ** 2
+            slope = (n * m[_WTY] - m[_WT] * m[_WY]) / var
+            scores = 100 * slope / (total / n)
+            scores[(n < 2) | (var <= 0) | (total <= 0)] = np.nan
+    scores[n == 0] = np.nan  # no rows for the state in the selection
+    return s_idx, scores
+
+
+def ranking(cube, states, year_range, n=10, metric="total", basis="combined"):
+    """Top-``n`` frame: ``Rank``, ``State/UT``, the metric and, for additive metrics, its share per source."""
+    s_idx, scores = metric_values(cube, states, year_range, metric, basis)
+    order, ranks = top_n(scores, n)
+
+    frame = pd.DataFrame({"Rank": ranks, "State/UT": cube.states[s_idx[order]], METRICS[metric]: scores[order]})
+    if metric in ADDITIVE:
+        # Every additive score is total × factor, so each source contributes its total × the same factor
+        totals = _window(cube, basis, s_idx[order], year_range)[_WY]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            factor = np.where(totals > 0, scores[order] / totals, 0.0)
+        for source, categories in SOURCES.items():
+            if set(categories) <= set(BASES[basis]):
+                frame[source] = cube.range_totals(year_range, list(cube.states[s_idx[order]]), categories).sum(axis=1) * factor
+    return frame
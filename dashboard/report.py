@@ -0,0 +1,240 @@
+"""Headless per-state reports: static HTML charts plus a KPI summary, without Streamlit.
+
+For every state/UT × year window the line trend, the offender-category area
+chart, the category pie and the map are built with the same code as the
+dashboard (:mod:`dashboard.figures`, :mod:`dashboard.kpis`) and written as one
+HTML page, next to a JSON file with that report's KPIs::
+
+    python -m dashboard.report --out reports                       # all states, default windows
+    python -m dashboard.report --out reports --windows 2005-2010 2015-2020 --states Bihar Kerala
+
+Reports are fanned out over a process pool. Each one records a fingerprint of
+its inputs – that state's slice of the cube for the window, the boundaries, the
+render options (how plotly.js is included) and ``REPORT_VERSION`` – and is skipped when the fingerprint is unchanged, so a
+nightly run only rebuilds what the new data touched. ``<out>/kpis.json``
+collects every report's KPIs.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Bump when the report layout changes, so every report is rebuilt
+REPORT_VERSION = 1
+
+DEFAULT_WINDOWS = ((1999, 2013), (2015, 2020), (1999, 2020))
+
+PLOTLY_JS = "plotly.min.js"
+
+_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+{script}
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; }}
+td {{ padding: 4px 12px; border-bottom: 1px solid #ddd; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+<table>{kpis}</table>
+{charts}
+</body>
+</html>
+"""
+
+# KPI key -> (label, format)
+KPI_LABELS = {
+    "total_cases": ("Total Cases", "{:,}"),
+    "cases_per_year": ("Avg Cases per Year", "{:,.0f}"),
+    "highest_case_year": ("Year with Highest Cases", "{}"),
+    "lowest_case_year": ("Year with Lowest Cases", "{}"),
+}
+
+
+# -------------------------
+# Tasks
+# -------------------------
+def slug(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def report_paths(out_dir, state, window):
+    base = Path(out_dir) / slug(state) / f"{window[0]}-{window[1]}"
+    return base.with_suffix(".html"), base.with_suffix(".json")
+
+
+def _geo_fingerprint(geo):
+    return hashlib.sha1(json.dumps(geo, sort_keys=True).encode()).hexdigest() if geo is not None else "no-map"
+
+
+def fingerprint(cube, state, window, geo_hash, plotlyjs="shared"):
+    """Hash of everything a report is built from, render options included."""
+    s_idx = cube.state_index([state])
+    y_sl = cube.year_slice(window)
+    digest = hashlib.sha1(f"{REPORT_VERSION}|{state}|{window}|{geo_hash}|{plotlyjs}|{cube.years[y_sl].tolist()}".encode())
+    digest.update(cube.values[s_idx, y_sl].tobytes())
+    digest.update(cube.present[s_idx, y_sl].tobytes())
+    return digest.hexdigest()
+
+
+def _is_current(html_path, json_path, inputs):
+    if not html_path.exists() or not json_path.exists():
+        return False
+    try:
+        with open(json_path, encoding="utf-8") as fh:
+            return json.load(fh).get("inputs") == inputs
+    except (OSError, ValueError):
+        return False
+
+
+# -------------------------
+# Worker
+# -------------------------
+_worker = {}
+
+
+def _init_worker(with_map):
+    from dashboard.cube import load_cube
+    from dashboard.geo import load_boundaries
+
+    _worker["cube"] = load_cube()
+    _worker["geo"] = load_boundaries() if with_map else None
+
+
+def _chart(fig, title):
+    if fig is None:
+        return f"<h2>{title}</h2><p>No data for this selection.</p>"
+    return f"<h2>{title}</h2>" + fig.to_html(full_html=False, include_plotlyjs=False)
+
+
+def render_report(task):
+    """Build one report in the current process; returns its KPI summary."""
+    from dashboard import figures
+    from dashboard.cube import OFFENDER_CATEGORIES
+    from dashboard.kpis import compute_kpis
+
+    state, window, html_path, json_path, inputs, plotlyjs = task
+    cube, geo = _worker["cube"], _worker["geo"]
+    states = (state,)
+    categories = tuple(OFFENDER_CATEGORIES)
+
+    charts = [
+        _chart(figures.yearly_trend_figure(cube, states, window), "Total Reported Cases"),
+        _chart(figures.category_trend_figure(cube, states, window, categories), "Yearly Trends by Offender Category"),
+        _chart(figures.category_pie_figure(cube, states, window, categories), "Offender Category Breakdown"),
+    ]
+    if geo is not None:
+        charts.append(_chart(figures.choropleth_figure(cube, geo, states, window), "Geospatial Distribution"))
+
+    kpis = compute_kpis(cube, states, window)
+    title = f"{state}, {window[0]}-{window[1]}"
+    if plotlyjs == "inline":
+        script = '<script type="text/javascript">' + _plotly_js_source() + "</script>"
+    else:
+        script = f'<script src="../{PLOTLY_JS}"></script>'
+    rows = "".join(f"<tr><td>{label}</td><td>{fmt.format(kpis[key])}</td></tr>" for key, (label, fmt) in KPI_LABELS.items())
+
+    html_path.parent.mkdir(parents=True, exist_ok=True)
+    _write_atomic(html_path, _PAGE.format(title=title, script=script, kpis=rows, charts="\n".join(charts)))
+    summary = {"state": state, "window": list(window), "inputs": inputs, "kpis": kpis}
+    _write_atomic(json_path, json.dumps(summary, indent=2, default=int))
+    return summary
+
+
+def _plotly_js_source():
+    from plotly.offline import get_plotlyjs
+
+    return get_plotlyjs()
+
+
+def _write_atomic(path, text):
+    tmp = path.with_suffix(f"{path.suffix}.{os.getpid()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+# -------------------------
+# Driver
+# -------------------------
+def generate_reports(out_dir, states=None, windows=DEFAULT_WINDOWS, jobs=None, force=False, with_map=True, plotlyjs="shared"):
+    """Build every missing or outdated report; returns ``(summaries, built, skipped)``."""
+    from dashboard.cube import load_cube
+    from dashboard.geo import load_boundaries
+
+    out_dir = Path(out_dir)
+    cube = load_cube()
+    geo_hash = _geo_fingerprint(load_boundaries()) if with_map else _geo_fingerprint(None)
+    states = list(cube.states) if states is None else list(states)
+    unknown = [s for s in states if s not in set(cube.states)]
+    if unknown:
+        raise ValueError(f"Unknown states/UTs {unknown}; expected canonical names such as {cube.states[0]!r}")
+
+    summaries, todo = [], []
+    for state in states:
+        for window in windows:
+            html_path, json_path = report_paths(out_dir, state, window)
+            inputs = fingerprint(cube, state, window, geo_hash, plotlyjs)
+            if not force and _is_current(html_path, json_path, inputs):
+                with open(json_path, encoding="utf-8") as fh:
+                    summaries.append(json.load(fh))
+            else:
+                todo.append((state, tuple(window), html_path, json_path, inputs, plotlyjs))
+
+    skipped = len(summaries)
+    if todo:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        if plotlyjs == "shared" and not (out_dir / PLOTLY_JS).exists():
+            _write_atomic(out_dir / PLOTLY_JS, _plotly_js_source())
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(with_map,)) as pool:
+            summaries.extend(pool.map(render_report, todo, chunksize=max(1, len(todo) // (4 * (jobs or os.cpu_count() or 1)))))
+
+    summaries.sort(key=lambda s: (s["state"], s["window"]))
+    out_dir.mkdir(parents=True, exist_ok=True)
+    _write_atomic(out_dir / "kpis.json", json.dumps(summaries, indent=2, default=int))
+    return summaries, len(todo), skipped
+
+
+def _window(text):
+    start, _, end = text.partition("-")
+    try:
+        return int(start), int(end or start)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected START-END, got {text!r}")
+
+
+def main(argv=None):
+    from dashboard.geo import boundaries_built
+
+    parser = argparse.ArgumentParser(prog="python -m dashboard.report", description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default="reports", help="output directory (default: reports)")
+    parser.add_argument("--states", nargs="+", default=None, help="canonical state/UT names (default: all)")
+    parser.add_argument("--windows", nargs="+", type=_window, default=list(DEFAULT_WINDOWS), metavar="START-END",
+                        help="year windows (default: 1999-2013 2015-2020 1999-2020)")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="rebuild reports whose inputs are unchanged")
+    parser.add_argument("--no-map", action="store_true", help="leave out the map (no boundary assets needed)")
+    parser.add_argument("--plotlyjs", choices=("shared", "inline"), default="shared",
+                        help="reference one plotly.min.js in the output directory, or inline it in every page")
+    args = parser.parse_args(argv)
+
+    if not args.no_map and not boundaries_built():
+        parser.error("the map boundaries have not been built; run `python -m dashboard.geo build` once, or pass --no-map")
+
+    start = time.perf_counter()
+    summaries, built, skipped = generate_reports(args.out, args.states, args.windows, args.jobs, args.force, not args.no_map, args.plotlyjs)
+    print(f"{len(summaries)} reports in {args.out}: {built} built, {skipped} unchanged ({time.perf_counter() - start:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Dashboard sections, the filter inputs each one depends on, and their result cache.
+
+Every section of ``main.py`` is rendered inside its own ``st.fragment`` and
+computes its figure (or KPI dict) through :func:`section_result`. Results are
+keyed on the section name, the data version and *only* the inputs listed in
+``SECTION_INPUTS``, and looked up in two tiers:
+
+1. the session's last result for that section (a widget change therefore
+   recomputes just the sections that actually read that widget);
+2. the process-wide LRU in :mod:`dashboard.cache`, holding serialized KPI dicts
+   and figure JSON shared across sessions (popular views such as the default
+   "Select All" / full year range are computed once per process).
+
+Each lookup is recorded by :mod:`dashboard.instrument` when it is enabled.
+"""
+
+import json
+from typing import NamedTuple
+
+import plotly.io as pio
+from plotly.basedatatypes import BaseFigure
+
+from dashboard import instrument
+from dashboard.cache import result_cache
+from dashboard.data import OFFENDER_CATEGORIES
+
+
+class Filters(NamedTuple):
+    """Canonical sidebar state (hashable, so it can be used in cache keys)."""
+    states: tuple        # sorted selected states/UTs; None when the state filter is off
+    year_range: tuple    # inclusive (start, end)
+    categories: tuple    # selected offender categories, in OFFENDER_CATEGORIES order
+
+
+# Filter inputs read by each section, in the order its builder takes them
+SECTION_INPUTS = {
+    "kpis": ("states", "year_range"),
+    "yearly_trend": ("states", "year_range"),
+    "category_trend": ("states", "year_range", "categories"),
+    "state_bars": ("states", "year_range"),
+    "category_pie": ("states", "year_range", "categories"),
+    "correlation": ("states", "year_range", "categories"),
+    "choropleth": ("states", "year_range"),
+    "choropleth_values": ("states", "year_range"),
+    # JSON-only results served by dashboard.api
+    "yearly_series": ("states", "year_range"),
+    "state_series": ("states", "year_range"),
+    "trend_table": ("states", "year_range"),
+}
+
+
+def make_filters(selected_states, year_range, selected_categories):
+    # An empty state selection leaves the state filter off
+    states = tuple(sorted(set(selected_states))) if selected_states else None
+    categories = tuple(c for c in OFFENDER_CATEGORIES if c in set(selected_categories))
+    return Filters(states, (int(year_range[0]), int(year_range[1])), categories)
+
+
+def section_key(name, filters):
+    return tuple(getattr(filters, field) for field in SECTION_INPUTS[name])
+
+
+# -------------------------
+# Serialization for the shared cache
+# -------------------------
+def _encode(result):
+    if isinstance(result, BaseFigure):
+        return "figure", result.to_json()
+    return "json", json.dumps(result)
+
+
+def _decode(payload):
+    kind, text = payload
+    return pio.from_json(text) if kind == "figure" else json.loads(text)
+
+
+def shared_result(name, filters, build, cube, *args, options=()):
+    """``(result, payload_bytes, hit)`` for section ``name`` from the process-wide cache, computing it on a miss."""
+    inputs = section_key(name, filters) + tuple(options)
+    key = (name, cube.version) + inputs
+
+    payload = result_cache.get(key)
+    if payload is not None:
+        return _decode(payload), len(payload[1]), True
+
+    result = build(cube, *args, *inputs)
+    payload = _encode(result)
+    result_cache.put(key, payload, len(payload[1]))
+    return result, len(payload[1]), False
+
+
+def section_result(name, filters, build, cube, *args, options=()):
+    """``build(cube, *args, *inputs, *options)`` for section ``name``, recomputed only when its inputs change.
+
+    ``options`` are the values of widgets local to the section's fragment (e.g.
+    the correlation method); they are part of the key like the filter inputs.
+    """
+    import streamlit as st  # only needed inside the app; dashboard.api shares shared_result
+
+    key = (cube.version,) + section_key(name, filters) + tuple(options)
+    store = st.session_state.setdefault("_section_results", {})
+
+    with instrument.section(name) as record:
+        cached = store.get(name)
+        if cached is not None and cached[0] == key:
+            result, nbytes, source = cached[1], cached[2], "session"
+        else:
+            result, nbytes, hit = shared_result(name, filters, build, cube, *args, options=options)
+            source = "shared" if hit else "computed"
+            store[name] = (key, result, nbytes)
+
+        if record:
+            categories = filters.categories if "categories" in SECTION_INPUTS[name] else None
+            record.update(cache=source, rows=cube.row_count(filters.states, filters.year_range, categories), payload_bytes=nbytes)
+    return result
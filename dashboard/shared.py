@@ -0,0 +1,192 @@
+"""Shared read-only dataset for several dashboard processes on one host.
+
+One process publishes the typed source rows (as uncompressed Arrow IPC files)
+and the aggregate cube with all of its prefix indexes (as ``.npy`` arrays)
+into a directory::
+
+    python -m dashboard.shared publish
+    python -m dashboard.shared publish --out /dev/shm/ncrb
+
+Processes started with ``DASHBOARD_SHARED_DIR`` pointing there do not parse
+or aggregate anything: they memory-map the published files read-only, so
+every worker reads the same pages of the OS page cache and a new worker is
+ready as soon as it has mapped them. Raw-row exports scan the mapped Arrow
+tables. Put the directory on ``/dev/shm`` to keep it in RAM.
+
+Each publish goes into its own ``<version>/`` subdirectory and ``CURRENT``
+names the live one; workers stat ``CURRENT`` on each rerun and attach to a new
+version when it changes (``python -m dashboard.ingest`` republishes when a
+published directory exists). Publishing unchanged inputs is a no-op.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from dashboard import store
+from dashboard.data import HAS_PARQUET, SNAPSHOT_DIR, content_hash, load
+
+SHARED_DIR = os.environ.get("DASHBOARD_SHARED_DIR")
+ENABLED = bool(SHARED_DIR)
+
+CURRENT = "CURRENT"
+META = "meta.json"
+
+# Bump when the published layout changes, so old versions are republished
+LAYOUT_VERSION = 1
+
+
+def publish_dir(out_dir=None):
+    return Path(out_dir or SHARED_DIR or SNAPSHOT_DIR / "shared")
+
+
+# -------------------------
+# Publish
+# -------------------------
+def inputs():
+    """What the published data is derived from (changes whenever the cube would)."""
+    if store.BACKEND == "parquet":
+        manifest = store.read_manifest()
+        return {"layout": LAYOUT_VERSION, "dataset": [manifest.get("id"), manifest.get("generation", 0)]}
+    return {"layout": LAYOUT_VERSION, **{name: content_hash(source.path) for name, source in store.SOURCES.items()}}
+
+
+def publish(out_dir=None, force=False):
+    """Publish the current data into ``out_dir``; returns the published version."""
+    from dashboard.cube import source_cube
+
+    if not HAS_PARQUET:
+        raise RuntimeError("Publishing the shared dataset needs pyarrow")
+    root = publish_dir(out_dir)
+    meta = {"inputs": inputs(), "created": time.time()}
+    version = hashlib.sha1(json.dumps(meta["inputs"], sort_keys=True).encode()).hexdigest()[:16]
+    if not force and (root / version / META).exists():
+        _point(root, version)
+        return version
+
+    tmp = root / f".{version}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    for name, array in source_cube().arrays().items():
+        np.save(tmp / f"{name}.npy", np.ascontiguousarray(array))
+    for name, source in store.SOURCES.items():
+        _write_table(tmp / f"{name}.arrow", source)
+    (tmp / META).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+    final = root / version
+    shutil.rmtree(final, ignore_errors=True)
+    os.replace(tmp, final)
+    previous = current_version(root)
+    _point(root, version)
+    _prune(root, keep={version, previous})
+    return version
+
+
+def _write_table(path, source):
+    """The typed rows of ``source`` as an uncompressed Arrow IPC file, written chunk by chunk."""
+    import pyarrow as pa
+
+    if store.BACKEND == "parquet":
+        empty, chunks = store.scan(source)
+    else:
+        frame = load(source)
+        empty, chunks = frame.iloc[:0], [frame]
+    schema = pa.Schema.from_pandas(empty, preserve_index=False)
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def _point(root, version):
+    tmp = root / f"{CURRENT}.{os.getpid()}.tmp"
+    tmp.write_text(version, encoding="utf-8")
+    os.replace(tmp, root / CURRENT)
+
+
+def _prune(root, keep):
+    # Workers still mapping a removed version keep their mappings (POSIX unlink semantics)
+    for path in root.iterdir():
+        if path.is_dir() and not path.name.startswith(".") and path.name not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def current_version(root=None):
+    try:
+        return (publish_dir(root) / CURRENT).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return None
+
+
+# -------------------------
+# Attach
+# -------------------------
+_tables = {}
+_lock = threading.Lock()
+
+
+def version_key(root=None):
+    """Cheap change token for the published data: the stat of ``CURRENT``."""
+    path = publish_dir(root) / CURRENT
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Nothing published at {path.parent}; run `python -m dashboard.shared publish`") from None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def attach_arrays(root=None):
+    """``(version, arrays)``: the published cube arrays, memory-mapped read-only."""
+    from dashboard.cube import AggregateCube
+
+    version = current_version(root)
+    base = publish_dir(root) / version
+    return version, {name: np.load(base / f"{name}.npy", mmap_mode="r") for name in AggregateCube.ARRAYS}
+
+
+def table(source, root=None):
+    """The published rows of ``source`` as an Arrow table over the memory-mapped file."""
+    import pyarrow as pa
+
+    version = current_version(root)
+    name = store.source_name(source)
+    cached = _tables.get(name)
+    if cached is None or cached[0] != version:
+        with _lock:
+            cached = _tables.get(name)
+            if cached is None or cached[0] != version:
+                mapped = pa.memory_map(str(publish_dir(root) / version / f"{name}.arrow"))
+                cached = _tables[name] = (version, pa.ipc.open_file(mapped).read_all())
+    return cached[1]
+
+
+def scan(source, states=None, year_range=(0, 9999), columns=None, batch_rows=store.BATCH_ROWS, root=None):
+    """``(empty frame, chunks)`` like :func:`dashboard.store.scan`, over the published rows."""
+    import pyarrow.dataset as ds
+
+    return store.scan_dataset(ds.dataset(table(source, root)), source, states, year_range, columns, batch_rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m dashboard.shared", description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    pub = sub.add_parser("publish", help="publish the current data for workers to attach to")
+    pub.add_argument("--out", default=None, help=f"directory (default: {publish_dir()})")
+    pub.add_argument("--force", action="store_true", help="republish even if the inputs are unchanged")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    version = publish(args.out, args.force)
+    print(f"published {version} to {publish_dir(args.out)} in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""Canonical state/UT dictionary with integer codes.
+
+The two NCRB sources and the boundary GeoJSON spell states differently
+("Orissa"/"Odisha", "A&N Islands"/"Andaman & Nicobar Islands", "Delhi UT",
+"Jammu & Kashmir*", ...). Every name is resolved once, at load time, to the
+Census 2011 state code (Telangana 36 and Ladakh 37 as assigned afterwards), and
+all joins – between the sources and with the map – run on those integers.
+
+Rows that are not a state/UT (the 1999 "Total ..." roll-ups and the city-wise
+block) resolve to ``None``; they, and everything after ``CITY_BLOCK_MARKER`` in
+the same year, are dropped at load.
+"""
+
+import re
+
+# -------------------------
+# Canonical Table
+# -------------------------
+# code -> canonical display name
+STATES = {
+    1: "Jammu & Kashmir",
+    2: "Himachal Pradesh",
+    3: "Punjab",
+    4: "Chandigarh",
+    5: "Uttarakhand",
+    6: "Haryana",
+    7: "Delhi",
+    8: "Rajasthan",
+    9: "Uttar Pradesh",
+    10: "Bihar",
+    11: "Sikkim",
+    12: "Arunachal Pradesh",
+    13: "Nagaland",
+    14: "Manipur",
+    15: "Mizoram",
+    16: "Tripura",
+    17: "Meghalaya",
+    18: "Assam",
+    19: "West Bengal",
+    20: "Jharkhand",
+    21: "Odisha",
+    22: "Chhattisgarh",
+    23: "Madhya Pradesh",
+    24: "Gujarat",
+    25: "Daman & Diu",
+    26: "Dadra & Nagar Haveli",
+    27: "Maharashtra",
+    28: "Andhra Pradesh",
+    29: "Karnataka",
+    30: "Goa",
+    31: "Lakshadweep",
+    32: "Kerala",
+    33: "Tamil Nadu",
+    34: "Puducherry",
+    35: "Andaman & Nicobar Islands",
+    36: "Telangana",
+    37: "Ladakh",
+}
+MAX_CODE = max(STATES)
+
+# Older/alternative spellings (matched after normalization, see _key)
+ALIASES = {
+    "A & N ISLANDS": 35,
+    "ANDAMAN & NICOBAR": 35,
+    "ANDAMAN & NICOBAR ISLAND": 35,
+    "ARUNANCHAL PRADESH": 12,
+    "D & N HAVELI": 26,
+    "DADARA & NAGAR HAVELLI": 26,
+    "DELHI UT": 7,
+    "NCT OF DELHI": 7,
+    "LAKSHADEEP": 31,
+    "ORISSA": 21,
+    "PONDICHERRY": 34,
+    "UTTARANCHAL": 5,
+}
+
+# States/UTs formed from another one; the parent's earlier figures include the child
+SPLITS = {
+    36: (28, 2014),   # Telangana from Andhra Pradesh, June 2014
+    37: (1, 2019),    # Ladakh from Jammu & Kashmir, October 2019
+}
+
+# Map regions covering several codes (the 2020 merger of the two western UTs, and
+# the undivided Jammu & Kashmir of the bundled boundaries)
+MERGED_REGIONS = {
+    "DADRA & NAGAR HAVELI & DAMAN & DIU": (25, 26),
+    "JAMMU & KASHMIR & LADAKH": (1, 37),
+}
+
+# In the 1999 data the state/UT block ends with this row and the city-wise block
+# follows it, reusing names such as "Delhi"
+CITY_BLOCK_MARKER = "TOTAL (ALL-INDIA)"
+
+# Rows in the sources that are not a state/UT
+NON_STATES = {
+    "TOTAL (ALL-INDIA)", "TOTAL (UTS)", "TOTAL STATES",
+    "AHMEDABAD", "BANGALORE", "BHOPAL", "CALCUTTA", "CHENNAI", "COIMBATORE", "HYDERABAD",
+    "INDORE", "JAIPUR", "KANPUR", "KOCHI", "LUCKNOW", "LUDHIANA", "MADURAI", "MUMBAI",
+    "NAGPUR", "PATNA", "PUNE", "SURAT", "VADODRA", "VARANASI", "VISHAKHAPATNAM",
+}
+
+
+def _key(name):
+    """Upper-case, drop footnote asterisks, spell 'and' as '&' and normalize spacing."""
+    key = str(name).upper().replace("*", "")
+    key = re.sub(r"\s*&\s*", " & ", key)
+    key = re.sub(r"\bAND\b", "&", key)
+    return re.sub(r"\s+", " ", key).strip()
+
+
+_LOOKUP = {_key(name): code for code, name in STATES.items()}
+_LOOKUP.update({_key(alias): code for alias, code in ALIASES.items()})
+_NON_STATE_KEYS = {_key(name) for name in NON_STATES}
+_CITY_BLOCK_KEY = _key(CITY_BLOCK_MARKER)
+_MERGED_KEYS = {_key(name): codes for name, codes in MERGED_REGIONS.items()}
+
+
+class UnknownStateError(KeyError):
+    pass
+
+
+def state_code(name):
+    """Code for a state/UT spelling; ``None`` for known non-state rows (totals, cities)."""
+    key = _key(name)
+    if key in _LOOKUP:
+        return _LOOKUP[key]
+    if key in _NON_STATE_KEYS:
+        return None
+    raise UnknownStateError(name)
+
+
+def is_city_block_marker(name):
+    return _key(name) == _CITY_BLOCK_KEY
+
+
+def region_codes(name):
+    """State codes covered by a map feature name (several for merged regions); empty if unknown."""
+    key = _key(name)
+    if key in _MERGED_KEYS:
+        return _MERGED_KEYS[key]
+    code = _LOOKUP.get(key)
+    return (code,) if code is not None else ()
+
+
+def undivided_code(code):
+    """Code of the state ``code`` was split from (itself if it was never split)."""
+    return SPLITS[code][0] if code in SPLITS else code
@@ -0,0 +1,295 @@
+"""Out-of-core storage backend: the sources as a year-partitioned Parquet dataset.
+
+With ``DASHBOARD_BACKEND=parquet`` no source is ever held as a pandas frame.
+The cube is built from per-(state, year) sums computed by Arrow, batch by
+batch, over a Hive-partitioned dataset (``<dataset dir>/<source>/YEAR=1999/...``),
+and raw-row exports scan the same dataset. Filters are pushed down: the year
+range prunes partitions, the state codes are a row filter evaluated by the
+scanner, and only the projected columns are read. What comes back into Python
+is the small aggregate (states × years) or one year of export rows at a time.
+
+Convert the CSVs once (in chunks, so the CSVs need not fit in memory either);
+every chunk goes through the same schema checks as the in-memory load
+(:func:`dashboard.data.validate_rows`)::
+
+    python -m dashboard.store convert
+    python -m dashboard.store convert --chunk-rows 500000 --out /data/ncrb-dataset
+
+The dataset directory defaults to ``<data dir>/dataset`` and can be moved
+with ``DASHBOARD_DATASET_DIR``. ``_manifest.json`` records what was converted
+and the files each later ``python -m dashboard.ingest`` appended; its stat is
+the data version the dashboard checks on each rerun.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import shutil
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import pandas as pd
+
+from dashboard import states as state_table
+from dashboard.data import ASSAULT, DATA_DIR, REPEATED_KEYS, STATE_CODE, SUMMARY, SchemaError, content_hash, read_source_csv, repeated_keys, repeated_problem, validate_rows
+
+BACKEND = os.environ.get("DASHBOARD_BACKEND", "memory").lower()
+DATASET_DIR = Path(os.environ.get("DASHBOARD_DATASET_DIR", DATA_DIR / "dataset"))
+
+MANIFEST = "_manifest.json"
+SOURCES = {"assault": ASSAULT, "summary": SUMMARY}
+
+CHUNK_ROWS = 1_000_000
+BATCH_ROWS = 1 << 17
+
+
+def source_name(source):
+    """Key of ``source`` in ``SOURCES`` (its directory name in the dataset)."""
+    return next(name for name, s in SOURCES.items() if s is source)
+
+
+def source_dir(source, root=None):
+    return Path(root or DATASET_DIR) / source_name(source)
+
+
+# -------------------------
+# One-shot Conversion
+# -------------------------
+def convert(out_dir=None, chunk_rows=CHUNK_ROWS):
+    """Write both CSVs as a partitioned dataset under ``out_dir``; returns the manifest.
+
+    Raises :class:`~dashboard.data.SchemaError` (and leaves any existing
+    dataset as it was) when a CSV does not match its schema.
+    """
+    out_dir = Path(out_dir or DATASET_DIR)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {"id": uuid.uuid4().hex, "created": time.time(), "generation": 0, "appends": [], "sources": {}}
+
+    tmps = {name: out_dir / f".{name}.{os.getpid()}.tmp" for name in SOURCES}
+    try:
+        for name, source in SOURCES.items():
+            manifest["sources"][name] = _convert_source(source, tmps[name], chunk_rows)
+    except SchemaError:
+        for tmp in tmps.values():
+            shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    # Swap the finished sources in; readers see the old or the new dataset, never half of one
+    for name, source in SOURCES.items():
+        final = source_dir(source, out_dir)
+        old = out_dir / f".{name}.{os.getpid()}.old"
+        if final.exists():
+            os.replace(final, old)
+        os.replace(tmps[name], final)
+        shutil.rmtree(old, ignore_errors=True)
+
+    _write_manifest(out_dir, manifest)
+    return manifest
+
+
+def _convert_source(source, tmp, chunk_rows):
+    """Validate ``source``'s CSV chunk by chunk into a dataset at ``tmp``; returns its manifest entry."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    shutil.rmtree(tmp, ignore_errors=True)
+    rows, city_block_years, seen = 0, set(), None if REPEATED_KEYS else set()
+    try:
+        for i, chunk in enumerate(read_source_csv(source.path, source, chunk_rows)):
+            frame = validate_rows(chunk, source, unique_keys=False, city_block_years=city_block_years)
+            # Keys may repeat across chunks, so uniqueness is tracked over the whole file
+            pairs = repeated_keys(frame, source, seen) if seen is not None else []
+            if pairs:
+                raise SchemaError([repeated_problem(pairs)])
+            pq.write_to_dataset(pa.Table.from_pandas(frame, preserve_index=False), tmp, partition_cols=[source.year_col],
+                                basename_template=f"part-{i}-{{i}}.parquet", existing_data_behavior="overwrite_or_ignore")
+            rows += len(frame)
+    except SchemaError as exc:
+        raise SchemaError([f"{source.file_name}: {problem}" for problem in exc.problems]) from None
+    return {"file": source.file_name, "content_hash": content_hash(source.path), "rows": rows}
+
+
+def _write_manifest(out_dir, manifest):
+    tmp = out_dir / f"{MANIFEST}.{os.getpid()}.tmp"
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp, out_dir / MANIFEST)
+
+
+def append(rows, root=None):
+    """Add typed, canonicalized rows (per source name) as new files; returns the manifest.
+
+    Used by ``python -m dashboard.ingest``. Each append is one manifest
+    generation listing the files it wrote, so running processes aggregate
+    only those files (see :func:`appended_files`).
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    root = Path(root or DATASET_DIR)
+    manifest = read_manifest(root)
+    generation = manifest.get("generation", 0) + 1
+    written = {}
+    for name, frame in rows.items():
+        source = SOURCES[name]
+        base = source_dir(source, root)
+        paths = []
+        pq.write_to_dataset(pa.Table.from_pandas(frame, preserve_index=False), base, partition_cols=[source.year_col],
+                            basename_template=f"append-{generation}-{{i}}.parquet", existing_data_behavior="overwrite_or_ignore",
+                            file_visitor=lambda written_file: paths.append(Path(written_file.path).relative_to(base).as_posix()))
+        written[name] = paths
+        info = manifest["sources"][name]
+        info.update(content_hash=content_hash(source.path), rows=info["rows"] + len(frame))
+
+    manifest["generation"] = generation
+    manifest.setdefault("appends", []).append({"generation": generation, "files": written})
+    _write_manifest(root, manifest)
+    return manifest
+
+
+def appended_files(manifest, since):
+    """Files per source name added by the appends after generation ``since``."""
+    files = {}
+    for entry in manifest.get("appends", []):
+        if entry["generation"] > since:
+            for name, paths in entry["files"].items():
+                files.setdefault(name, []).extend(paths)
+    return files
+
+
+def read_manifest(root=None):
+    with open(Path(root or DATASET_DIR) / MANIFEST, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def dataset_version(root=None):
+    """Cheap change token for the dataset: the manifest's stat."""
+    path = Path(root or DATASET_DIR) / MANIFEST
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"No dataset at {path.parent}; run `python -m dashboard.store convert`") from None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+# -------------------------
+# Scans (predicate pushdown)
+# -------------------------
+def dataset(source, root=None, files=None):
+    """Arrow dataset over ``source``'s directory, or over just ``files`` (relative to it)."""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    base = source_dir(source, root)
+    partitioning = ds.partitioning(pa.schema([(source.year_col, pa.int16())]), flavor="hive")
+    if files is None:
+        return ds.dataset(base, format="parquet", partitioning=partitioning)
+    return ds.dataset([str(base / f) for f in files], format="parquet", partitioning=partitioning, partition_base_dir=str(base))
+
+
+def predicate(source, states=None, year_range=(0, 9999)):
+    """Arrow filter for the dashboard's state/year filters (``states`` are canonical names)."""
+    import pyarrow.dataset as ds
+
+    year = ds.field(source.year_col)
+    expr = (year >= year_range[0]) & (year <= year_range[1])
+    if states is not None:
+        expr &= ds.field(STATE_CODE).isin(_codes(states))
+    return expr
+
+
+def _codes(states):
+    codes = []
+    for name in states:
+        try:
+            code = state_table.state_code(name)
+        except state_table.UnknownStateError:
+            continue  # like the cube: unknown names select nothing
+        if code is not None:
+            codes.append(code)
+    return codes
+
+
+def aggregate(source, states=None, year_range=(0, 9999), root=None, files=None):
+    """Per-(state code, year) sums of ``source``'s counts, computed by Arrow one batch at a time."""
+    import pyarrow as pa
+
+    keys, counts = [STATE_CODE, source.year_col], list(source.count_cols)
+    if files is not None and not files:
+        return pd.DataFrame({col: pd.Series(dtype="int64") for col in keys + counts})
+
+    scanner = dataset(source, root, files).scanner(columns=keys + counts, filter=predicate(source, states, year_range), batch_size=BATCH_ROWS)
+    partials = [_sum_by(pa.Table.from_batches([batch]), keys, counts) for batch in scanner.to_batches() if batch.num_rows]
+    if not partials:
+        return pd.DataFrame({col: pd.Series(dtype="int64") for col in keys + counts})
+
+    # Sum the per-batch partials (each at most states × years rows)
+    return _sum_by(pa.concat_tables(partials), keys, counts).select(keys + counts).to_pandas()
+
+
+def _sum_by(table, keys, counts):
+    summed = table.group_by(keys).aggregate([(col, "sum") for col in counts])
+    return summed.select([f"{col}_sum" for col in counts] + keys).rename_columns(counts + keys)
+
+
+def scan(source, states=None, year_range=(0, 9999), columns=None, batch_rows=BATCH_ROWS, root=None):
+    """``(empty frame, chunks)``: the filtered, projected rows of ``source`` as pandas chunks."""
+    return scan_dataset(dataset(source, root), source, states, year_range, columns, batch_rows)
+
+
+def scan_dataset(data, source, states=None, year_range=(0, 9999), columns=None, batch_rows=BATCH_ROWS):
+    """:func:`scan` over any Arrow dataset holding ``source``'s typed rows.
+
+    Rows come out ordered by (year, state code) whatever the dataset's file
+    layout, like the in-memory export. The scan goes one year at a time, so at
+    most one year's filtered rows are materialized.
+    """
+    import pyarrow.compute as pc
+
+    expr = predicate(source, states, year_range)
+    columns = list(data.schema.names) if columns is None else list(columns)
+    years = sorted(pc.unique(data.to_table(columns=[source.year_col], filter=expr)[source.year_col]).to_pylist())
+    chunks = (chunk for year in years for chunk in _year_chunks(data, source, expr, year, columns, batch_rows))
+    first = next(chunks, None)
+    if first is None:
+        return data.schema.empty_table().select(columns).to_pandas(), iter(())
+    # The empty frame comes from a real chunk: an empty categorical would lose its string type
+    return first.iloc[:0], itertools.chain([first], chunks)
+
+
+def _year_chunks(data, source, expr, year, columns, batch_rows):
+    """The rows of one year, stably sorted by state code, as pandas chunks of at most ``batch_rows``."""
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+
+    read = columns if STATE_CODE in columns else columns + [STATE_CODE]
+    table = data.to_table(columns=read, filter=expr & (ds.field(source.year_col) == year))
+    table = table.take(pc.sort_indices(table, sort_keys=[(STATE_CODE, "ascending")])).select(columns)
+    for start in range(0, table.num_rows, batch_rows):
+        yield table.slice(start, batch_rows).to_pandas()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m dashboard.store", description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    conv = sub.add_parser("convert", help="convert the CSV sources into the partitioned dataset")
+    conv.add_argument("--out", default=None, help=f"dataset directory (default: {DATASET_DIR})")
+    conv.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="CSV rows read per chunk")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        manifest = convert(args.out, args.chunk_rows)
+    except SchemaError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    for name, info in manifest["sources"].items():
+        print(f"{name}: {info['rows']:,} rows from {info['file']}")
+    print(f"wrote {args.out or DATASET_DIR} in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""Linear and log-linear trends with short-horizon forecasts, fitted in batches.
+
+Every series the dashboard plots is a row of the aggregate cube along the year
+axis, so trends are fitted for many series at once: the weighted normal
+equations of ``y = a + b·(year - origin)`` (``log(1 + y)`` for the log-linear
+model) are summed over the year axis for every series and solved as one stack
+of 2×2 systems. Years without data (e.g. 2014, or a category's years outside
+its source) carry zero weight, so each series is fitted on its own observed
+years and can then be evaluated anywhere, including the gap between the two
+sources and a few years past the last one.
+
+:func:`state_trends` fits every state/UT × category and is cached per data
+version; :func:`selection_trend` fits the summed series of a filter selection
+(the overlays on the line and area charts).
+"""
+
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+from dashboard.cube import CATEGORIES
+
+MODELS = ("linear", "loglinear")
+HORIZON = 3
+
+
+@dataclass(frozen=True)
+class Trend:
+    """Fitted trends for a batch of series (leading axes of ``intercept`` / ``slope``)."""
+    model: str
+    origin: float          # the year the time axis is centred on
+    intercept: np.ndarray
+    slope: np.ndarray
+    first_year: np.ndarray  # first / last observed year per series (0 where unobserved)
+    last_year: np.ndarray
+    observed: np.ndarray    # number of years each fit used; fits need at least 2
+
+    def predict(self, years):
+        """Fitted values at ``years`` (``(n,)`` for all series, or ``(*series, n)``); NaN for unfitted series."""
+        t = np.asarray(years, dtype=np.float64) - self.origin
+        y = self.intercept[..., None] + self.slope[..., None] * t
+        return np.expm1(y) if self.model == "loglinear" else y
+
+    @property
+    def growth(self):
+        """Relative change per year: ``e^b - 1`` (log-linear), or the slope over the level at ``origin`` (linear)."""
+        if self.model == "loglinear":
+            return np.expm1(self.slope)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.slope / self.intercept
+
+
+def fit(years, values, observed, model="linear"):
+    """Fit every series in ``values`` (``(*series, years)``) on the years where ``observed`` is true."""
+    if model not in MODELS:
+        raise ValueError(f"Unknown trend model {model!r}; expected one of {MODELS}")
+    years = np.asarray(years, dtype=np.float64)
+    origin = float(years.mean()) if len(years) else 0.0
+    t = years - origin
+    w = observed.astype(np.float64)
+    y = values.astype(np.float64)
+    if model == "loglinear":
+        y = np.log1p(np.maximum(y, 0))
+
+    # Normal equations per series: [[Σw, Σwt], [Σwt, Σwt²]] · [a, b] = [Σwy, Σwty]
+    s0, s1, s2 = w.sum(-1), (w * t).sum(-1), (w * t * t).sum(-1)
+    lhs = np.stack([np.stack([s0, s1], -1), np.stack([s1, s2], -1)], -2)
+    rhs = np.stack([(w * y).sum(-1), (w * t * y).sum(-1)], -1)
+
+    fitted = s0 >= 2
+    lhs[~fitted] = np.eye(2)  # keep the batch solvable; these series come out NaN
+    coef = np.linalg.solve(lhs, rhs[..., None])[..., 0]
+    coef[~fitted] = np.nan
+
+    first = last = np.zeros(s0.shape, dtype=int)
+    if len(years):
+        seen = observed.any(-1)
+        first = np.where(seen, years[observed.argmax(-1)], 0).astype(int)
+        last = np.where(seen, years[::-1][observed[..., ::-1].argmax(-1)], 0).astype(int)
+    return Trend(model, origin, coef[..., 0], coef[..., 1], first, last, s0.astype(int))
+
+
+# -------------------------
+# Cube slices
+# -------------------------
+_cache = {}
+_lock = threading.Lock()
+
+
+def state_trends(cube, model="linear"):
+    """Trends of every state/UT × category over all loaded years; ``Trend`` of shape ``(states, categories)``."""
+    key = (model, cube.undivided)
+    cached = _cache.get(key)
+    if cached is None or cached[0] != cube.version:
+        with _lock:
+            cached = _cache.get(key)
+            if cached is None or cached[0] != cube.version:
+                values = np.moveaxis(np.asarray(cube.values), 1, -1)
+                present = np.moveaxis(np.asarray(cube.present), 1, -1)
+                cached = _cache[key] = (cube.version, fit(cube.years, values, present, model))
+    return cached[1]
+
+
+def selection_trend(cube, states, year_range, categories, model="linear"):
+    """``(years, Trend)`` for each of ``categories`` summed over ``states`` in ``year_range``.
+
+    Pass ``categories=None`` for the total over every category (one series).
+    """
+    s_idx = cube.state_index(states)
+    y_sl = cube.year_slice(year_range)
+    c_idx = cube.category_index(CATEGORIES if categories is None else categories)
+    cells = cube.values[s_idx][:, y_sl][:, :, c_idx]
+    present = cube.present[s_idx][:, y_sl][:, :, c_idx]
+
+    years = cube.years[y_sl]
+    if categories is None:
+        values, observed = cells.sum(axis=(0, 2)), present.any(axis=(0, 2))
+    else:
+        values, observed = cells.sum(axis=0).T, present.any(axis=0).T
+    return years, fit(years, values, observed, model)
+
+
+def forecast_years(trend, horizon=HORIZON):
+    """The ``horizon`` years after each series' last observed year: shape ``(*series, horizon)``."""
+    return trend.last_year[..., None] + np.arange(1, horizon + 1)
+
+
+def trend_table(cube, states, year_range, horizon=HORIZON):
+    """``[{"state", "category", <model>: {"slope", "growth", "forecast"}}]`` per state/UT and category with a fit."""
+    full = year_range[0] <= cube.min_year and year_range[1] >= cube.max_year
+    s_idx = cube.state_index(states)
+    rows = {}
+    for model in MODELS:
+        if full:
+            trend = state_trends(cube, model)
+        else:
+            y_sl = cube.year_slice(year_range)
+            values = np.moveaxis(np.asarray(cube.values)[:, y_sl], 1, -1)
+            present = np.moveaxis(np.asarray(cube.present)[:, y_sl], 1, -1)
+            trend = fit(cube.years[y_sl], values, present, model)
+        ahead = forecast_years(trend, horizon)
+        predicted = trend.predict(ahead)
+        for i in s_idx:
+            for c, category in enumerate(CATEGORIES):
+                if trend.observed[i, c] < 2:
+                    continue
+                rows.setdefault((i, c), {"state": cube.states[i], "category": category})[model] = {
+                    "slope": float(trend.slope[i, c]),
+                    "growth": _finite(trend.growth[i, c]),
+                    "forecast": [{"year": int(y), "value": float(v)} for y, v in zip(ahead[i, c], predicted[i, c])],
+                }
+    return list(rows.values())
+
+
+def _finite(value):
+    return float(value) if np.isfinite(value) else None
@@ -1,9 +1,11 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-import geopandas as gpd
+from dashboard import census, explorer, export, figures, instrument, map_component, ranking
+from dashboard.cube import load_cube, undivided_cube, undivided_states
+from dashboard.data import OFFENDER_CATEGORIES
+from dashboard.geo import boundaries_built, load_boundaries
+from dashboard.kpis import compute_kpis
+from dashboard.sections import make_filters, section_result
+from dashboard.trends import HORIZON
 
 
 
@@ -54,10 +56,13 @@ st.markdown("""
 # # -------------------------
 # Load Data
 # -------------------------
-# Dataset for 1999-2013
-df = pd.read_csv("Cleaned State wise Sexual Assault (Detailed) 1999 - 2013.csv")
-# Dataset for 2015-2020
-df1 = pd.read_csv("Cleaned Summary of cases (rape) 2015-2020.csv")
+# Per-section timings for this rerun (no-op unless DASHBOARD_INSTRUMENT=1)
+instrument.start_run()
+
+# Both datasets (1999-2013 and 2015-2020) are parsed once per process and folded into a
+# state x year x category cube shared across sessions (see dashboard/cube.py)
+with instrument.section("load_data"):
+    cube = load_cube()
 
 
 
@@ -107,9 +112,16 @@ st.sidebar.image("logo.jpg", use_container_width=True)
 st.sidebar.markdown("<div class='sidebar-subtitle'>📅 Filter by Year</div>", unsafe_allow_html=True)
 
 # Year Range Filter
-min_year = int(min(df["YEAR"].min(), df1["Year"].min()))
-max_year = int(max(df["YEAR"].max(), df1["Year"].max()))
-year_range = st.sidebar.slider("Select Year Range", min_value=min_year, max_value=max_year, value=(min_year, max_year))
+min_year = cube.min_year
+max_year = cube.max_year
+
+if explorer.CLIENT:
+    # Years and states are edited in the explorer (section 1), which syncs them back here once idle
+    synced = st.session_state.get("explorer") or {}
+    year_range = tuple(synced.get("year_range") or (min_year, max_year))
+    st.sidebar.markdown("<div class='summary-box'>Year range and States/UT are selected in the explorer (section 1).</div>", unsafe_allow_html=True)
+else:
+    year_range = st.sidebar.slider("Select Year Range", min_value=min_year, max_value=max_year, value=(min_year, max_year))
 
 
 
@@ -118,14 +130,18 @@ year_range = st.sidebar.slider("Select Year Range", min_value=min_year, max_valu
 # -------------------------
 # 📍 States/UT Filter
 # -------------------------
-st.sidebar.markdown("<div class='sidebar-subtitle'>🌍 Select States/UT</div>", unsafe_allow_html=True)
+if explorer.CLIENT:
+    # None from the explorer is its "All States/UTs"
+    selected_states = synced.get("states") or list(cube.states)
+else:
+    st.sidebar.markdown("<div class='sidebar-subtitle'>🌍 Select States/UT</div>", unsafe_allow_html=True)
 
-states_list = sorted(set(df["STATE/UT"].unique()).union(set(df1["State/UT"].unique())))
-states_list.insert(0, "Select All")
-selected_states = st.sidebar.multiselect("Select States/UT", options=states_list, default="Select All")
+    states_list = list(cube.states)
+    states_list.insert(0, "Select All")
+    selected_states = st.sidebar.multiselect("Select States/UT", options=states_list, default="Select All")
 
-if "Select All" in selected_states:
-    selected_states = states_list[1:]
+    if "Select All" in selected_states:
+        selected_states = states_list[1:]
 
 
 
@@ -136,7 +152,7 @@ if "Select All" in selected_states:
 # -------------------------
 st.sidebar.markdown("<div class='sidebar-subtitle'>👤 Offender Categories</div>", unsafe_allow_html=True)
 
-offender_categories = ['Known_To_The_Victims', 'Parents_Close_Family_Members', 'Relatives', 'Neighbours', 'Other_Known_Persons']
+offender_categories = list(OFFENDER_CATEGORIES)
 offender_categories.insert(0, "Select All")
 selected_categories = st.sidebar.multiselect("Select Offender Categories", options=offender_categories, default="Select All")
 
@@ -150,88 +166,90 @@ if "Select All" in selected_categories:
 # -------------------------
 # Apply Filters
 # -------------------------
-df_filtered = df[(df["YEAR"] >= year_range[0]) & (df["YEAR"] <= year_range[1])]
-df1_filtered = df1[(df1["Year"] >= year_range[0]) & (df1["Year"] <= year_range[1])]
-
-if selected_states:
-    df_filtered = df_filtered[df_filtered["STATE/UT"].isin(selected_states)]
-    df1_filtered = df1_filtered[df1_filtered["State/UT"].isin(selected_states)]
+# Normalized filter state; each section below only reads the inputs it depends on (dashboard/sections.py)
+filters = make_filters(selected_states, year_range, selected_categories)
 
 
 
 
 
 # -------------------------
-# KPIs
+# ⬇️ Download Data
 # -------------------------
-# 📊 KPI Section Header
-st.markdown("<h2 style='color:yellow; text-align:center;'>📊 Key Performance Indicators</h2>", unsafe_allow_html=True)
+st.sidebar.markdown("<div class='sidebar-subtitle'>⬇️ Download Data</div>", unsafe_allow_html=True)
 
-# --- KPI Calculations ---
-total_cases_1999_2020 = df_filtered.drop(columns=["YEAR", "STATE/UT"]).select_dtypes(include=np.number).sum().sum() + df1_filtered["Cases_Reported"].sum()
+EXPORT_LABELS = {"assault": "Offender categories (1999-2013)", "summary": "Reported cases (2015-2020)", "yearly": "Yearly totals", "states": "State/UT totals"}
 
-# Calculate yearly totals from both datasets
-yearly_total_filtered = df_filtered.groupby("YEAR").sum(numeric_only=True).sum(axis=1)
-yearly_total_filtered1 = df1_filtered.groupby("Year")["Cases_Reported"].sum()
+@instrument.fragment
+def render_downloads(filters):
+    dataset = st.selectbox("Dataset", list(EXPORT_LABELS), format_func=EXPORT_LABELS.get, key="export_dataset")
+    fmt = st.selectbox("Format", list(export.FORMATS), format_func=str.upper, key="export_format")
+    available = export.columns_of(dataset)
+    columns = st.multiselect("Columns", available, default=available, key=f"export_columns_{dataset}")
 
-# Combine and filter
-combined_yearly_series = pd.concat([yearly_total_filtered, yearly_total_filtered1.rename_axis('YEAR')]).sort_index()
-combined_yearly_series = combined_yearly_series.loc[year_range[0]:year_range[1]]
+    if export.API_URL:
+        # Streamed by the API chunk by chunk; nothing is built in this process
+        # Leave out what the API defaults to anyway (every state, every column) to keep the URL short
+        states = filters.states if filters.states and len(filters.states) < len(cube.states) else None
+        projected = columns if columns != available else None
+        st.link_button("Download", export.export_url(dataset, fmt, states, filters.year_range, projected),
+                       disabled=not columns, use_container_width=True)
+    else:
+        # Generated only when the button is clicked, for the current filters, but whole: st.download_button
+        # needs the bytes in memory. Set DASHBOARD_API_URL to stream large extracts instead.
+        st.download_button(
+            "Download", data=lambda: export.export_bytes(dataset, fmt, states=filters.states, year_range=filters.year_range, columns=columns, cube=cube),
+            file_name=export.file_name(dataset, fmt), mime=export.FORMATS[fmt][0], disabled=not columns, on_click="ignore", use_container_width=True)
 
-# Handle highest/lowest year
-if combined_yearly_series.empty:
-    highest_case_year = 'No data'
-    lowest_case_year = 'No data'
-else:
-    highest_case_year = combined_yearly_series.idxmax()
-    lowest_case_year = combined_yearly_series.idxmin()
 
-average_cases_per_state = total_cases_1999_2020 / len(selected_states) if selected_states else 0
-cases_per_year = total_cases_1999_2020 / (year_range[1] - year_range[0] + 1)  # Adjusted to selected range
+with st.sidebar:
+    render_downloads(filters)
+
 
-# State with highest average cases
-state_total_filtered = df_filtered.groupby("STATE/UT").sum(numeric_only=True).sum(axis=1)
-state_total_filtered1 = df1_filtered.groupby("State/UT")["Cases_Reported"].sum()
 
-combined_state_series = pd.concat([state_total_filtered.rename_axis('State/UT'), state_total_filtered1]).groupby('State/UT').sum()
 
-if not combined_state_series.empty:
-    state_avg_cases = combined_state_series / (year_range[1] - year_range[0] + 1)
-    highest_avg_state = state_avg_cases.idxmax()
-    highest_avg_state_cases = int(state_avg_cases.max())
-else:
-    highest_avg_state = 'No data'
-    highest_avg_state_cases = 0
 
+# -------------------------
+# KPIs
+# -------------------------
+# 📊 KPI Section Header
+st.markdown("<h2 style='color:yellow; text-align:center;'>📊 Key Performance Indicators</h2>", unsafe_allow_html=True)
 
 # 🔢 Formatting numbers for better readability
 def format_number(num):
     return "{:,}".format(int(num))
 
-# --- KPI Layout ---
-col1, col2, col3 = st.columns(3)
-col4, col5, col6 = st.columns(3)
 
+@instrument.fragment
+def render_kpis(filters):
+    # --- KPI Calculations ---
+    kpis = section_result("kpis", filters, compute_kpis, cube)
 
-# --- Displaying KPIs ---
-kpi_data = [
-    ("Total Cases (1999-2020)", format_number(total_cases_1999_2020)),
-    ("Avg Cases per State/UT", format_number(average_cases_per_state)),
-    ("Avg Cases per Year", format_number(cases_per_year)),
-    ("Year with Highest Cases", highest_case_year),
-    ("Year with Lowest Cases", lowest_case_year),
-    (f"Highest Avg Cases Per Year ({highest_avg_state})", format_number(highest_avg_state_cases)),]
+    # --- KPI Layout ---
+    col1, col2, col3 = st.columns(3)
+    col4, col5, col6 = st.columns(3)
 
+    # --- Displaying KPIs ---
+    kpi_data = [
+        ("Total Cases (1999-2020)", format_number(kpis["total_cases"])),
+        ("Avg Cases per State/UT", format_number(kpis["average_cases_per_state"])),
+        ("Avg Cases per Year", format_number(kpis["cases_per_year"])),
+        ("Year with Highest Cases", kpis["highest_case_year"]),
+        ("Year with Lowest Cases", kpis["lowest_case_year"]),
+        (f"Highest Avg Cases Per Year ({kpis['highest_avg_state']})", format_number(kpis["highest_avg_state_cases"])),]
+
+    # --- Assigning KPIs to Columns ---
+    for col, (label, value) in zip([col1, col2, col3, col4, col5, col6], kpi_data):
+        with col:
+            st.markdown(f"""
+                <div class='kpi-container'>
+                    <div class='kpi-label'>{label}</div>
+                    <div class='kpi-value'>{value}</div>
+                </div>
+            """, unsafe_allow_html=True)
 
-# --- Assigning KPIs to Columns ---
-for col, (label, value) in zip([col1, col2, col3, col4, col5, col6], kpi_data):
-    with col:
-        st.markdown(f"""
-            <div class='kpi-container'>
-                <div class='kpi-label'>{label}</div>
-                <div class='kpi-value'>{value}</div>
-            </div>
-        """, unsafe_allow_html=True)
+
+render_kpis(filters)
 
 
 # --- Custom Styling for KPIs ---
@@ -281,24 +299,33 @@ st.markdown("---")
 
 st.markdown('<h3 style="color: yellow; text-align: center;">1. Total Reported Cases Nationwide (1999-2020)</h3>', unsafe_allow_html=True)
 
-# For 1999-2013: Group by YEAR and sum all numeric columns
-yearly_total = df_filtered.groupby("YEAR").sum(numeric_only=True).sum(axis=1).reset_index()
-yearly_total.columns = ["Year", "Total Cases"]
+TREND_OPTIONS = {"None": None, "Linear": "linear", "Log-linear": "loglinear"}
+
 
-# For 2015-2020: Group by Year for Cases_Reported
-yearly = df1_filtered.groupby("Year")["Cases_Reported"].sum().reset_index()
-yearly.columns = ["Year", "Total Cases"]
+@instrument.fragment
+def render_yearly_trend(filters):
+    trend = st.radio("Trend Overlay", list(TREND_OPTIONS), horizontal=True, key="yearly_trend_model")
+    fig = section_result("yearly_trend", filters, figures.yearly_trend_figure, cube, options=(TREND_OPTIONS[trend],))
+    st.plotly_chart(fig, use_container_width=True)
+    if TREND_OPTIONS[trend] is not None:
+        st.markdown(f"<div class='summary-box'>The dashed line is a {trend.lower()} fit over the years with data, extended {HORIZON} years ahead. Open circles estimate years without data, such as 2014.</div>", unsafe_allow_html=True)
 
-# Ensure both datasets are concatenated properly
-combined_df = pd.concat([yearly_total, yearly], ignore_index=True).sort_values(by="Year")
 
-# Plot using plotly express
-fig = px.line(combined_df, x="Year", y="Total Cases", markers=True, labels={"Total Cases": "Total Reported Cases", "Year": "Year"},)
+def render_explorer(filters):
+    # Not a fragment: a sync from the explorer reruns the whole page (KPIs and the category sections)
+    trend = st.radio("Trend Overlay", list(TREND_OPTIONS), horizontal=True, key="yearly_trend_model")
+    overlay = ()
+    if TREND_OPTIONS[trend] is not None:
+        fig = section_result("yearly_trend", filters, figures.yearly_trend_figure, cube, options=(TREND_OPTIONS[trend],))
+        overlay = explorer.trend_overlay(fig)
+    with instrument.section("explorer"):
+        explorer.explorer(cube, load_boundaries() if boundaries_built() else None, filters, overlay)
 
-fig.update_traces(line=dict(width=2, color='yellow'))
-fig.update_layout(template='plotly_white')
 
-st.plotly_chart(fig, use_container_width=True)
+if explorer.CLIENT:
+    render_explorer(filters)
+else:
+    render_yearly_trend(filters)
 
 st.markdown("""
 <div style="font-size:16px; text-align:justify; color: white;">
@@ -319,26 +346,25 @@ st.markdown("---")
 
 st.markdown('<h3 style="color: yellow;text-align: center;">2. Yearly Trends by Offender Category (1999-2013)</h3>', unsafe_allow_html=True)
 
-if df_filtered.empty or df_filtered.iloc[:, 1:].sum().sum() == 0:  # Check if data is empty or all values are zero
-    st.markdown("<div class='summary-box'>Yearly trend data not available for the selected year range.</div>", unsafe_allow_html=True)
-else:
-    category_trends = df_filtered.groupby("YEAR").sum(numeric_only=True)
-    
-    fig2 = go.Figure()
-    for column in category_trends.columns:
-        fig2.add_trace(go.Scatter(x=category_trends.index, y=category_trends[column], mode='lines', name=column, stackgroup='one', hoverinfo='x+y+name'))
-
-    fig2.update_layout(xaxis_title="Year", yaxis_title="Number of Cases", template='plotly_white', colorway=['#fdae61', '#abd9e9', '#2c7bb6', '#d7191c',
-    '#1a9641'])
-    
-    st.plotly_chart(fig2, use_container_width=True)
-    
-    st.markdown("""
-        <div class='summary-box'>
-            This graph shows the yearly trends of sexual assault cases in India from 1999 to 2013 based on different offender categories. 
-            The highest number of cases involve Other Known Persons, and there is a noticeable increase in total cases after 2010.
-        </div>
-    """, unsafe_allow_html=True)
+@instrument.fragment
+def render_category_trend(filters):
+    trend = st.radio("Trend Overlay", list(TREND_OPTIONS), horizontal=True, key="category_trend_model")
+    fig2 = section_result("category_trend", filters, figures.category_trend_figure, cube, options=(TREND_OPTIONS[trend],))
+
+    if fig2 is None:
+        st.markdown("<div class='summary-box'>Yearly trend data not available for the selected year range.</div>", unsafe_allow_html=True)
+    else:
+        st.plotly_chart(fig2, use_container_width=True)
+
+        st.markdown("""
+            <div class='summary-box'>
+                This graph shows the yearly trends of sexual assault cases in India from 1999 to 2013 based on different offender categories. 
+                The highest number of cases involve Other Known Persons, and there is a noticeable increase in total cases after 2010.
+            </div>
+        """, unsafe_allow_html=True)
+
+
+render_category_trend(filters)
 
 st.markdown("---")
 
@@ -349,19 +375,36 @@ st.markdown("---")
 # 3. State-wise Comparison (Horizontal Bar Chart)
 # -------------------------
 
-st.markdown('<h3 style="color: yellow;text-align: center;">3. Top 10 States by Total Cases Reported (1999-2020)</h3>', unsafe_allow_html=True)
+st.markdown('<h3 style="color: yellow;text-align: center;">3. Top States/UTs by Cases Reported (1999-2020)</h3>', unsafe_allow_html=True)
+
+RANKING_BASES = {"combined": "Combined (1999-2020)", "1999-2013": "1999-2013", "2015-2020": "2015-2020"}
+
+
+@instrument.fragment
+def render_state_bars(filters):
+    n_col, metric_col, basis_col = st.columns([1, 2, 3])
+    n = n_col.number_input("Top N", min_value=1, max_value=len(cube.states), value=10, key="ranking_n")
+    metric = metric_col.selectbox("Rank By", list(ranking.METRICS), format_func=ranking.METRICS.get, key="ranking_metric")
+    basis = basis_col.radio("Period", list(RANKING_BASES), format_func=RANKING_BASES.get, horizontal=True, key="ranking_basis")
+    undivided = st.checkbox("Undivided states (count Telangana in Andhra Pradesh and Ladakh in Jammu & Kashmir in every year)", key="ranking_undivided")
 
-# For 1999-2013: Aggregate data by STATE/UT
-state_total = df_filtered.groupby("STATE/UT").sum(numeric_only=True).sum(axis=1).sort_values(ascending=False).head(10)
+    # Andhra Pradesh includes Telangana until 2013 but not from 2015; the undivided view joins the two eras on the same area
+    view = undivided_cube(cube) if undivided else cube
+    view_filters = filters._replace(states=undivided_states(filters.states)) if undivided else filters
+    fig3 = section_result("state_bars", view_filters, figures.state_bars_figure, view, options=(int(n), metric, basis))
+    if fig3 is None:
+        st.markdown("<div class='summary-box'>No State/UT has data for the selected filters and period.</div>", unsafe_allow_html=True)
+    else:
+        st.plotly_chart(fig3, use_container_width=True)
+        if metric == "growth":
+            st.markdown("<div class='summary-box'>Growth is the least-squares trend of the yearly cases, as a percentage of their average, over the years with data.</div>", unsafe_allow_html=True)
+        elif metric == "per_100k":
+            st.markdown(f"<div class='summary-box'>Rates use Census {census.CENSUS_YEAR} populations. Telangana and Ladakh are counted in their parent state {'in every year' if undivided else 'before they were split off'}.</div>", unsafe_allow_html=True)
+        if not undivided:
+            st.markdown("<div class='summary-box'>Andhra Pradesh's figures include Telangana up to 2013 but not from 2015 (and Jammu & Kashmir's include Ladakh up to 2018), so their totals mix two different areas. Tick <i>Undivided states</i> to compare them on the same area.</div>", unsafe_allow_html=True)
 
-# For 2015-2020: Aggregate Cases_Reported by State/UT
-df1_grouped = df1_filtered.groupby("State/UT")["Cases_Reported"].sum().reset_index().sort_values(by="Cases_Reported", ascending=False).head(10)
 
-fig3 = go.Figure()
-fig3.add_trace(go.Bar(y=state_total.index, x=state_total.values,name="1999-2013", orientation='h'))
-fig3.add_trace(go.Bar(y=df1_grouped["State/UT"], x=df1_grouped["Cases_Reported"], name="2015-2020", orientation='h'))
-fig3.update_layout(xaxis_title="Total Cases Reported", yaxis_title="State/UT")
-st.plotly_chart(fig3, use_container_width=True)
+render_state_bars(filters)
 
 st.markdown("""
 <div style="font-size:16px; text-align:justify; color: white;">
@@ -381,24 +424,23 @@ st.markdown("---")
 
 st.markdown('<h3 style="color: yellow;text-align: center;">4. Offender Category Distribution (1999-2013)</h3>', unsafe_allow_html=True)
 
-available_pie_cols = [col for col in offender_categories if col in df_filtered.columns]
+@instrument.fragment
+def render_category_pie(filters):
+    fig4 = section_result("category_pie", filters, figures.category_pie_figure, cube)
 
-if df_filtered.empty or df_filtered[available_pie_cols].sum().sum() == 0:
-    st.markdown("<div class='summary-box'>Offender category data not available for the selected year range.</div>", unsafe_allow_html=True)
-else:
-    category_totals = df_filtered[available_pie_cols].sum()
-    
-    fig4 = px.pie(values=category_totals.values, names=category_totals.index, color_discrete_sequence=px.colors.qualitative.Pastel, hole=0.3)
-    
-    fig4.update_traces(textinfo='percent+label', pull=[0.1, 0.1, 0.1, 0.1, 0.1], marker=dict(line=dict(color='#000000', width=2)))
-    
-    st.plotly_chart(fig4, use_container_width=True)
-    
-    st.markdown("""
-    <div class='summary-box'>
-    This 3D pie chart illustrates the distribution of offender categories in sexual assault cases from 1999 to 2013. The majority (50%) of offenders were known to the victims, followed by other known persons (28.7%) and neighbors (16.9%), highlighting the prevalence of assaults by familiar individuals.
-    </div>
-    """, unsafe_allow_html=True)
+    if fig4 is None:
+        st.markdown("<div class='summary-box'>Offender category data not available for the selected year range.</div>", unsafe_allow_html=True)
+    else:
+        st.plotly_chart(fig4, use_container_width=True)
+
+        st.markdown("""
+        <div class='summary-box'>
+        This 3D pie chart illustrates the distribution of offender categories in sexual assault cases from 1999 to 2013. The majority (50%) of offenders were known to the victims, followed by other known persons (28.7%) and neighbors (16.9%), highlighting the prevalence of assaults by familiar individuals.
+        </div>
+        """, unsafe_allow_html=True)
+
+
+render_category_pie(filters)
 
 st.markdown("---")
 
@@ -412,30 +454,35 @@ st.markdown("---")
 
 st.markdown('<h3 style="color: yellow;text-align: center;">5. Correlation Heatmap (1999-2013)</h3>', unsafe_allow_html=True)
 
-df_corr = df_filtered if not df_filtered.empty else df
+@instrument.fragment
+def render_correlation(filters):
+    method_col, view_col = st.columns(2)
+    method = method_col.radio("Correlation Method", ["Pearson", "Rank (Spearman)"], horizontal=True, key="corr_method")
+    by_state = view_col.checkbox("Per State/UT", key="corr_by_state")
 
-if available_pie_cols:
-    # Compute correlation matrix
-    corr = df_corr[available_pie_cols].corr().round(2)
-    
-    # Create 3D surface plot
-    fig_heat_3d = go.Figure(data=[go.Surface(z=corr.values, x=corr.columns, y=corr.index, colorscale='RdBu')])
-    
-    fig_heat_3d.update_layout(width=900, height=700, 
-                              scene=dict(xaxis_title="Offender Categories", yaxis_title="Offender Categories", zaxis_title="Correlation",),autosize=True,)
+    options = ("pearson" if method == "Pearson" else "rank", by_state)
+    fig_heat_3d = section_result("correlation", filters, figures.correlation_figure, cube, options=options)
 
-    # Display in Streamlit
-    st.plotly_chart(fig_heat_3d, use_container_width=True)
+    if fig_heat_3d is not None:
+        # Display in Streamlit
+        st.plotly_chart(fig_heat_3d, use_container_width=True)
 
-    # Add summary box
-    st.markdown("<div class='summary-box'>This 3D heatmap visualizes the correlation between different offender categories, helping to identify hidden patterns in the data.</div>", unsafe_allow_html=True)
+        # Add summary box
+        if by_state:
+            st.markdown("<div class='summary-box'>Each row shows, for one State/UT, how strongly each pair of offender categories moves together across the selected years.</div>", unsafe_allow_html=True)
+        else:
+            st.markdown("<div class='summary-box'>This 3D heatmap visualizes the correlation between different offender categories, helping to identify hidden patterns in the data.</div>", unsafe_allow_html=True)
 
-else:
-    st.markdown("""
-    <div class='summary-box'>
-    This 3D correlation heatmap visualizes the relationship between different offender categories from 1999 to 2013. The color gradient indicates the strength of correlations, helping to identify patterns and connections among offender types.
-    </div>
-    """, unsafe_allow_html=True)
+    else:
+        st.markdown("<div class='summary-box'>Not enough offender category data for the selected filters to compute a correlation.</div>", unsafe_allow_html=True)
+        st.markdown("""
+        <div class='summary-box'>
+        This 3D correlation heatmap visualizes the relationship between different offender categories from 1999 to 2013. The color gradient indicates the strength of correlations, helping to identify patterns and connections among offender types.
+        </div>
+        """, unsafe_allow_html=True)
+
+
+render_correlation(filters)
 
 st.markdown("---")
 
@@ -449,33 +496,29 @@ st.markdown("---")
 
 st.markdown('<h3 style="color: yellow;text-align: center;">6. Geospatial Distribution of Total Sexual Assault Cases in India (1999-2020)</h3>', unsafe_allow_html=True)
 
-# Standardize state names
-df["STATE/UT"] = df["STATE/UT"].str.upper().str.strip()
-df1["State/UT"] = df1["State/UT"].str.upper().str.strip()
-df_filtered["STATE/UT"] = df_filtered["STATE/UT"].str.upper().str.strip()
-df1_filtered["State/UT"] = df1_filtered["State/UT"].str.upper().str.strip()
-
-# Load GeoJSON
-india_geo = gpd.read_file("https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson")
-india_geo["ST_NM"] = india_geo["ST_NM"].str.upper().str.strip()
-
-# Prepare data for mapping
-df_geo = df_filtered.groupby('STATE/UT').sum(numeric_only=True).sum(axis=1).reset_index(name='Cases_1999_2013')
-df1_geo = df1_filtered.groupby('State/UT')['Cases_Reported'].sum().reset_index(name='Cases_2015_2020')
-
-# Merge datasets
-combined_data = pd.merge(df_geo, df1_geo, left_on='STATE/UT', right_on='State/UT', how='outer')
-combined_data['Total_Cases'] = combined_data['Cases_1999_2013'].fillna(0) + combined_data['Cases_2015_2020'].fillna(0)
-
-# Merge with GeoJSON
-merged_data = india_geo.merge(combined_data, how="left", left_on="ST_NM", right_on="STATE/UT")
-merged_data['Total_Cases'] = merged_data['Total_Cases'].fillna(0)
-
-fig5 = px.choropleth(merged_data, geojson=india_geo, locations='ST_NM', featureidkey="properties.ST_NM", color='Total_Cases', color_continuous_scale="OrRd", scope="asia", labels={'Total_Cases': 'Reported Cases'})
-fig5.update_geos(fitbounds="locations", visible=False)
-fig5.update_layout(margin={"r": 0, "t": 30, "l": 0, "b": 0})
-st.plotly_chart(fig5, use_container_width=True)
-st.markdown("""<div class='summary-box'>
+@instrument.fragment
+def render_choropleth(filters):
+    # Load GeoJSON (bundled, pre-simplified and name-normalized; cached per process)
+    india_geo = load_boundaries()
+
+    if map_component.COMPACT:
+        # Geometry is sent once per session; reruns ship only the per-state values
+        values = section_result("choropleth_values", filters, figures.choropleth_values, cube, india_geo)
+        map_component.choropleth_map(values)
+    else:
+        fig5 = section_result("choropleth", filters, figures.choropleth_figure, cube, india_geo)
+        st.plotly_chart(fig5, use_container_width=True)
+
+
+if not boundaries_built():
+    st.markdown("<div class='summary-box'>The map boundary assets under <code>assets/geo/</code> are missing: rebuild them with <code>python -m dashboard.geo build</code>.</div>", unsafe_allow_html=True)
+else:
+    if explorer.CLIENT:
+        st.markdown("<div class='summary-box'>Drawn in the explorer in section 1.</div>", unsafe_allow_html=True)
+    else:
+        render_choropleth(filters)
+
+    st.markdown("""<div class='summary-box'>
 This choropleth map visualizes the geographical distribution of total sexual assault cases in India from 1999 to 2020. Darker red areas indicate a higher number of reported cases, while lighter shades represent relatively fewer cases. The map helps in understanding crime trends across different states and identifying the most affected regions
 </div>
 """, unsafe_allow_html=True)
@@ -505,7 +548,8 @@ contact_form = """
     </form>
 """
 
-st.markdown(contact_form, unsafe_allow_html=True)
+with instrument.section("feedback", payload_bytes=len(contact_form)):
+    st.markdown(contact_form, unsafe_allow_html=True)
 
 # Enhanced Local CSS for a Modern Look
 def local_css():
@@ -576,3 +620,7 @@ This Streamlit dashboard analyzes sexual assault and rape cases in India (1999-2
 
 
 
+# -------------------------
+# 🛠 Debug Panel (DASHBOARD_INSTRUMENT=1)
+# -------------------------
+instrument.render_debug_panel()
@@ -0,0 +1,40 @@
+"""Year ranges that fall outside the loaded years (regression for an IndexError past the last year)."""
+
+import pytest
+
+from dashboard import api, export
+from dashboard.cube import load_cube
+from dashboard.kpis import compute_kpis
+
+
+@pytest.fixture(scope="module")
+def cube():
+    return load_cube()
+
+
+@pytest.mark.parametrize("offset", [-20, 10])
+def test_range_outside_loaded_years_is_empty(cube, offset):
+    year_range = (cube.min_year + offset, cube.min_year + offset + 5) if offset < 0 else (cube.max_year + offset, cube.max_year + offset + 10)
+
+    assert cube.range_totals(year_range).sum() == 0
+    assert cube.row_count(year_range=year_range) == 0
+    kpis = compute_kpis(cube, None, year_range)
+    assert kpis["total_cases"] == 0
+    assert kpis["highest_case_year"] == "No data"
+    assert export.export_bytes("states", year_range=year_range, fmt="csv").count(b"\n") == 1
+
+
+def test_range_overlapping_loaded_years_is_clamped(cube):
+    assert cube.range_totals((cube.max_year, cube.max_year + 10)).sum() == cube.range_totals((cube.max_year, cube.max_year)).sum()
+    assert cube.range_totals((cube.min_year - 10, cube.max_year + 10)).sum() == cube.range_totals((cube.min_year, cube.max_year)).sum()
+
+
+@pytest.mark.parametrize("start, end", [(2030, 2040), (1990, 1995)])
+def test_api_rejects_range_outside_loaded_years(cube, start, end):
+    with pytest.raises(api.BadRequest):
+        api.parse_filters(cube, {"start": [str(start)], "end": [str(end)]})
+
+
+def test_api_accepts_partly_loaded_range(cube):
+    filters = api.parse_filters(cube, {"start": [str(cube.max_year)], "end": [str(cube.max_year + 10)]})
+    assert filters.year_range == (cube.max_year, cube.max_year + 10)